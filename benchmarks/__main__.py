@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from src.ass_writer import generate_ass, layout_ass
+from src.config import load_config
+from src.parser import load_lyrics, parse_lyrics
+from src.romanize import Romanizer, auto_romanize, romanize_overlay
+from src.timeline import Timeline
+
+from .synthetic import synthetic_lyric, write_synthetic
+
+ROOT = Path(__file__).resolve().parent.parent
+CONFIG_PATH = str(ROOT / "config.example.json")
+RESULTS_VERSION = 1
+NOISE_FLOOR_SECONDS = 0.001
+
+BUNDLED = {
+    "birdbrain": ROOT / "Lyrics" / "Birdbrain" / "lyric.json",
+    "machine_love": ROOT / "Lyrics" / "Machine Love" / "lyric.json",
+}
+
+LANE_COUNTS = (2, 3, 4)
+BACKGROUND_LINE_COUNTS = (1000, 2000, 4000)
+TIMELINE_FPS = 60
+TIMELINE_SECONDS = 60
+
+SYNTHETIC = {
+    "synthetic_small": dict(lines=50, syllables_per_line=6),
+    "synthetic_large": dict(lines=2000, syllables_per_line=10, background_density=0.3),
+    "synthetic_dense_background": dict(lines=1000, background_density=1.0, line_gap=0.05),
+    "synthetic_japanese": dict(lines=300, syllables_per_line=8, japanese_ratio=0.7),
+}
+
+
+def _best_of(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _pipeline(path: str) -> None:
+    config = load_config(CONFIG_PATH)
+    lyrics = load_lyrics(path)
+    romaji = romanize_overlay(lyrics, Romanizer(), mode=config.romanize_mode)
+    generate_ass(lyrics, config, romaji)
+
+
+def bench_case(path: str, repeat: int) -> dict:
+    config = load_config(CONFIG_PATH)
+    lyrics = load_lyrics(path)
+    romaji = romanize_overlay(lyrics, Romanizer(), mode=config.romanize_mode)
+    stages = {
+        "load_config": lambda: load_config(CONFIG_PATH),
+        "load_lyrics": lambda: load_lyrics(path),
+        "auto_romanize": lambda: auto_romanize(lyrics, Romanizer(), mode=config.romanize_mode),
+        "romanize_overlay": lambda: romanize_overlay(lyrics, Romanizer(), mode=config.romanize_mode),
+        "generate_ass": lambda: generate_ass(lyrics, config, romaji),
+    }
+    timings = {name: _best_of(fn, repeat) for name, fn in stages.items()}
+
+    tracemalloc.start()
+    try:
+        _pipeline(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "lead_lines": len(lyrics.lead_lines),
+        "background_lines": len(lyrics.background_lines),
+        "syllables": sum(len(line.syllables) for line in lyrics.lead_lines + lyrics.background_lines),
+        "stages": timings,
+        "peak_memory_bytes": peak,
+    }
+
+
+def bench_lanes(repeat: int) -> dict:
+    lyrics = parse_lyrics(synthetic_lyric(lines=4000, syllables_per_line=6, line_gap=0.05, overlap=0.5))
+    base = load_config(CONFIG_PATH)
+    stages = {}
+    for lanes in LANE_COUNTS:
+        config = replace(base, lanes=lanes)
+        stages[f"layout_{lanes}_lanes"] = _best_of(lambda: layout_ass(lyrics, config), repeat)
+    return {"lead_lines": len(lyrics.lead_lines), "stages": stages}
+
+
+def bench_background(repeat: int) -> dict:
+    config = load_config(CONFIG_PATH)
+    romanizer = Romanizer()
+    stages = {}
+    for lines in BACKGROUND_LINE_COUNTS:
+        raw = synthetic_lyric(
+            lines=lines,
+            syllables_per_line=6,
+            background_density=1.0,
+            japanese_ratio=0.5,
+            line_gap=0.05,
+            overlap=0.3,
+        )
+        lyrics = parse_lyrics(raw)
+        romaji = romanize_overlay(lyrics, romanizer, mode=config.romanize_mode)
+        stages[f"layout_{lines}_lines"] = _best_of(lambda: layout_ass(lyrics, config, romaji), repeat)
+    return {"background_line_counts": list(BACKGROUND_LINE_COUNTS), "stages": stages}
+
+
+def _naive_active(lyrics, t_cs: int) -> list:
+    active = []
+    for line in lyrics.lead_lines + lyrics.background_lines:
+        if line.start_cs <= t_cs < line.end_cs:
+            active.append((line, [s for s in line.syllables if s.start_cs <= t_cs < s.end_cs]))
+    return active
+
+
+def bench_timeline(repeat: int) -> dict:
+    lyrics = parse_lyrics(synthetic_lyric(lines=4000, syllables_per_line=8, background_density=0.3))
+    config = load_config(CONFIG_PATH)
+    timeline = Timeline.build(lyrics, config)
+    middle = lyrics.lead_lines[len(lyrics.lead_lines) // 2].start
+    frames = [middle + i / TIMELINE_FPS for i in range(TIMELINE_FPS * TIMELINE_SECONDS)]
+
+    def advance() -> None:
+        cursor = timeline.cursor()
+        for t in frames:
+            cursor.advance(t)
+
+    def point() -> None:
+        for t in frames:
+            timeline.at(t)
+
+    def naive() -> None:
+        for t in frames[:TIMELINE_FPS]:
+            _naive_active(lyrics, int(t * 100))
+
+    stages = {
+        "timeline_build": _best_of(lambda: Timeline.build(lyrics, config), repeat),
+        f"cursor_advance_{TIMELINE_SECONDS}s": _best_of(advance, repeat),
+        f"point_query_{TIMELINE_SECONDS}s": _best_of(point, repeat),
+        "naive_scan_1s": _best_of(naive, repeat),
+    }
+    return {"lead_lines": len(lyrics.lead_lines), "frames": len(frames), "stages": stages}
+
+
+def bench_startup(repeat: int) -> dict:
+    code = "import sys, src.cli; print('pykakasi' in sys.modules)"
+    best = float("inf")
+    loaded = False
+    for _ in range(repeat):
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        best = min(best, time.perf_counter() - started)
+        loaded = proc.stdout.strip() == "True"
+    return {"stages": {"import_cli": best}, "pykakasi_loaded": loaded}
+
+
+def run(case_names: Optional[List[str]], repeat: int) -> dict:
+    results: Dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: str(path) for name, path in BUNDLED.items()}
+        for name, params in SYNTHETIC.items():
+            if case_names and name not in case_names:
+                continue
+            path = str(Path(tmp) / f"{name}.json")
+            write_synthetic(path, **params)
+            paths[name] = path
+        for name, path in paths.items():
+            if case_names and name not in case_names:
+                continue
+            results[name] = bench_case(path, repeat)
+    if not case_names or "lanes" in case_names:
+        results["lanes"] = bench_lanes(repeat)
+    if not case_names or "background" in case_names:
+        results["background"] = bench_background(repeat)
+    if not case_names or "timeline" in case_names:
+        results["timeline"] = bench_timeline(repeat)
+    if not case_names or "startup" in case_names:
+        results["startup"] = bench_startup(repeat)
+    return {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, case in current["cases"].items():
+        base_case = baseline.get("cases", {}).get(name)
+        if not base_case:
+            continue
+        for stage, seconds in case["stages"].items():
+            base_seconds = base_case["stages"].get(stage)
+            if base_seconds is None:
+                continue
+            ratio = seconds / base_seconds if base_seconds else float("inf")
+            marker = ""
+            if ratio > 1 + threshold and seconds - base_seconds > NOISE_FLOOR_SECONDS:
+                marker = "  REGRESSION"
+                regressions.append(f"{name}.{stage}")
+            print(f"{name:28} {stage:14} {base_seconds * 1000:10.2f}ms -> {seconds * 1000:10.2f}ms  x{ratio:.2f}{marker}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark parse, romanize and render stages")
+    parser.add_argument("-o", "--output", default=None, help="Write JSON results to this path")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per stage; the fastest is kept")
+    parser.add_argument("--cases", default=None, help="Comma-separated case names (default: all)")
+    parser.add_argument("--compare", default=None, help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown ratio before failing")
+    args = parser.parse_args()
+
+    case_names = args.cases.split(",") if args.cases else None
+    results = run(case_names, args.repeat)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
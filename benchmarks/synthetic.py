@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import random
+from typing import List
+
+_LATIN_WORDS = [
+    "love", "machine", "bird", "brain", "never", "single", "word", "standing",
+    "ready", "your", "companion", "absurd", "heart", "signal", "over", "again",
+]
+_JAPANESE_WORDS = [
+    "君", "の", "名前", "を", "呼んで", "いる", "夜空", "に", "光る", "星",
+    "カラオケ", "が", "好き", "愛", "して", "る", "機械", "心",
+]
+
+
+def _syllables(rnd: random.Random, start: float, count: int, japanese_ratio: float) -> List[dict]:
+    syllables = []
+    t = start
+    for _ in range(count):
+        if rnd.random() < japanese_ratio:
+            text = rnd.choice(_JAPANESE_WORDS)
+            part_of_word = rnd.random() < 0.5
+        else:
+            word = rnd.choice(_LATIN_WORDS)
+            cut = rnd.randint(1, len(word))
+            text = word[:cut]
+            part_of_word = cut < len(word) and rnd.random() < 0.5
+        duration = rnd.uniform(0.08, 0.6)
+        syllables.append(
+            {
+                "Text": text,
+                "IsPartOfWord": part_of_word,
+                "StartTime": round(t, 3),
+                "EndTime": round(t + duration, 3),
+            }
+        )
+        t += duration + rnd.choice([0.0, 0.0, 0.02, 0.15])
+    return syllables
+
+
+def _line(syllables: List[dict]) -> dict:
+    return {
+        "Syllables": syllables,
+        "StartTime": syllables[0]["StartTime"],
+        "EndTime": syllables[-1]["EndTime"],
+    }
+
+
+def synthetic_lyric(
+    lines: int = 200,
+    syllables_per_line: int = 8,
+    background_density: float = 0.2,
+    japanese_ratio: float = 0.0,
+    line_gap: float = 0.4,
+    seed: int = 0,
+    overlap: float = 0.0,
+) -> dict:
+    rnd = random.Random(seed)
+    content = []
+    t = 1.0
+    for _ in range(lines):
+        count = max(1, int(rnd.gauss(syllables_per_line, syllables_per_line / 4)))
+        lead = _line(_syllables(rnd, t, count, japanese_ratio))
+        item = {"Type": "Vocal", "OppositeAligned": False, "Lead": lead}
+        if rnd.random() < background_density:
+            bg_start = rnd.uniform(lead["StartTime"], lead["EndTime"])
+            item["Background"] = [_line(_syllables(rnd, bg_start, rnd.randint(1, 4), japanese_ratio))]
+        content.append(item)
+        duration = lead["EndTime"] - lead["StartTime"]
+        t = lead["EndTime"] - overlap * duration + rnd.uniform(0.0, 2 * line_gap)
+    return {
+        "queries": [
+            {
+                "operation": "lyrics",
+                "operationId": "0",
+                "result": {"data": {"Type": "Syllable", "StartTime": 1.0, "Content": content}},
+            }
+        ]
+    }
+
+
+def write_synthetic(path: str, **kwargs) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(synthetic_lyric(**kwargs), f, ensure_ascii=False)
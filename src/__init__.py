@@ -1 +1 @@
-__all__ = ["cli", "config", "generator", "parser", "ass_writer", "model"]
+__all__ = ["cli", "config", "generator", "parser", "ass_writer", "model", "batch", "server", "aio", "catalog", "timeline", "formats"]
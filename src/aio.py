@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import Iterable, List, Optional
+
+from .ass_writer import CompiledConfig, compile_config
+from .batch import BatchResult, output_path_for
+from .config import AssConfig, default_config, load_config
+from .generator import STDOUT, render_file
+
+
+def _load_compiled(config_path: Optional[str]) -> CompiledConfig:
+    return compile_config(load_config(config_path))
+
+
+async def _wait_finished(future: asyncio.Future) -> None:
+    while not future.done():
+        try:
+            await asyncio.wait({future})
+        except asyncio.CancelledError:
+            continue
+    if not future.cancelled():
+        future.exception()
+
+
+class AsyncRenderer:
+    def __init__(
+        self,
+        config: AssConfig | CompiledConfig | None = None,
+        executor: Optional[Executor] = None,
+        max_concurrency: Optional[int] = None,
+        incremental: bool = False,
+        lyrics_cache: bool = False,
+    ) -> None:
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.config = compile_config(config or default_config())
+        self.executor = executor
+        self.incremental = incremental
+        self.lyrics_cache = lyrics_cache
+        self._limit = asyncio.Semaphore(max_concurrency) if max_concurrency else nullcontext()
+
+    @classmethod
+    async def from_config_path(
+        cls,
+        config_path: Optional[str],
+        executor: Optional[Executor] = None,
+        max_concurrency: Optional[int] = None,
+        incremental: bool = False,
+        lyrics_cache: bool = False,
+    ) -> "AsyncRenderer":
+        loop = asyncio.get_running_loop()
+        config = await loop.run_in_executor(executor, _load_compiled, config_path)
+        return cls(config, executor, max_concurrency, incremental, lyrics_cache)
+
+    async def render(self, input_path: str, output_path: str) -> bool:
+        if output_path == STDOUT:
+            raise ValueError("Async renders need an output path")
+        async with self._limit:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self.executor,
+                render_file,
+                input_path,
+                output_path,
+                self.config,
+                self.incremental,
+                None,
+                self.lyrics_cache,
+            )
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                await _wait_finished(future)
+                raise
+
+    async def _render_result(self, input_path: str) -> BatchResult:
+        output_path = output_path_for(input_path)
+        started = time.perf_counter()
+        try:
+            changed = await self.render(input_path, output_path)
+        except Exception as exc:
+            elapsed = time.perf_counter() - started
+            return BatchResult(input_path, output_path, elapsed, f"{type(exc).__name__}: {exc}")
+        return BatchResult(input_path, output_path, time.perf_counter() - started, changed=changed)
+
+    async def render_many(self, input_paths: Iterable[str]) -> List[BatchResult]:
+        return list(await asyncio.gather(*(self._render_result(p) for p in input_paths)))
+
+
+async def generate_async(
+    input_path: str,
+    output_path: str,
+    config_path: Optional[str],
+    incremental: bool = False,
+    executor: Optional[Executor] = None,
+) -> bool:
+    renderer = await AsyncRenderer.from_config_path(config_path, executor, incremental=incremental)
+    return await renderer.render(input_path, output_path)
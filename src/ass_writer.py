@@ -1,16 +1,23 @@
 from __future__ import annotations
 
-from typing import List
+import heapq
+import re
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
 
-from .config import AssConfig, StyleConfig, ass_style_line
-from .model import Line, Lyrics, Syllable
+from .config import KARAOKE_GRANULARITIES, AssConfig, StyleConfig, ass_style_line
+from .event_cache import EventCache
+from .model import Line, Lyrics, RomajiOverlay, Syllable
 
 
+_OVERRIDE_BLOCK = re.compile(r"(?<!\\)\{")
+
 _PUNCTUATION = set([",", ".", "!", "?", ":", ";", ")", "]", "}", "%", "\"", "'", "\u2014", "\u2026"])
 
 
-def _format_time(seconds: float) -> str:
-    total_cs = int(round(seconds * 100))
+def _format_time(total_cs: int) -> str:
     cs = total_cs % 100
     total_sec = total_cs // 100
     s = total_sec % 60
@@ -66,10 +73,10 @@ def _anchor_y(style: StyleConfig, config: AssConfig) -> int:
     return int(round(config.play_res_y / 2))
 
 
-def _original_offset(style: StyleConfig | None) -> int:
+def _original_offset(style: CompiledStyle | None) -> int:
     if not style:
         return 0
-    return max(8, int(round(style.fontsize * 0.6)))
+    return style.original_offset
 
 
 def _build_text(
@@ -77,44 +84,86 @@ def _build_text(
     use_romanized: bool,
     karaoke: bool,
     start_offset_cs: int = 0,
+    granularity: str = "char",
+    romaji: Optional[Tuple[Optional[str], ...]] = None,
 ) -> str:
+    if karaoke:
+        tokens = _karaoke_tokens(syllables, use_romanized, start_offset_cs, granularity, romaji)
+        return "".join(text if k is None else f"{{\\k{k}}}{text}" for k, text in tokens)
+
     parts: List[str] = []
     prev: Syllable | None = None
+    for idx, s in enumerate(syllables):
+        parts.append(_escape_ass(_syllable_text(prev, s, use_romanized, romaji[idx] if romaji else s.romanized)))
+        prev = s
+    return "".join(parts)
 
-    if karaoke and start_offset_cs > 0:
-        parts.append(f"{{\\k{start_offset_cs}}}")
 
-    for s in syllables:
-        text = s.romanized if use_romanized and s.romanized else s.text
-        if prev:
-            if use_romanized:
-                spacer = _romanized_spacer(prev, text)
-                if spacer:
-                    text = spacer + text
-            else:
-                if _needs_space(prev, text, False):
-                    text = " " + text
-        text = _escape_ass(text)
-
-        if karaoke:
-            if prev:
-                gap_cs = int(round((s.start - prev.end) * 100))
-                if gap_cs > 0:
-                    parts.append(f"{{\\k{gap_cs}}}")
-            dur_cs = max(1, int(round((s.end - s.start) * 100)))
-            leading = len(text) - len(text.lstrip(" "))
-            if leading:
-                parts.append(" " * leading)
-                text = text[leading:]
-            if text:
-                segments = _linear_segments(dur_cs, len(text))
-                for ch, seg in zip(text, segments):
-                    parts.append(f"{{\\k{seg}}}{ch}")
+def _syllable_text(prev: Syllable | None, s: Syllable, use_romanized: bool, romanized: Optional[str]) -> str:
+    text = romanized if use_romanized and romanized else s.text
+    if prev:
+        if use_romanized:
+            spacer = _romanized_spacer(prev, text)
+            if spacer:
+                text = spacer + text
         else:
-            parts.append(text)
+            if _needs_space(prev, text, False):
+                text = " " + text
+    return text
+
+
+def syllable_texts(
+    line: Line,
+    use_romanized: bool,
+    romaji: Optional[Tuple[Optional[str], ...]] = None,
+) -> List[str]:
+    texts = []
+    prev: Syllable | None = None
+    for idx, s in enumerate(line.syllables):
+        texts.append(_syllable_text(prev, s, use_romanized, romaji[idx] if romaji else s.romanized))
         prev = s
+    return texts
 
-    return "".join(parts)
+
+def _karaoke_tokens(
+    syllables: List[Syllable],
+    use_romanized: bool,
+    start_offset_cs: int,
+    granularity: str,
+    romaji: Optional[Tuple[Optional[str], ...]] = None,
+) -> List[List]:
+    tokens: List[List] = []
+    if start_offset_cs > 0:
+        tokens.append([start_offset_cs, ""])
+
+    prev: Syllable | None = None
+    word_token: List | None = None
+    for idx, s in enumerate(syllables):
+        text = _escape_ass(_syllable_text(prev, s, use_romanized, romaji[idx] if romaji else s.romanized))
+        gap_cs = s.start_cs - prev.end_cs if prev else 0
+        if gap_cs > 0:
+            tokens.append([gap_cs, ""])
+            word_token = None
+        dur_cs = max(1, s.end_cs - s.start_cs)
+        leading = len(text) - len(text.lstrip(" "))
+        if leading:
+            if tokens:
+                tokens[-1][1] += " " * leading
+            else:
+                tokens.append([None, " " * leading])
+            text = text[leading:]
+        if text:
+            if granularity == "char":
+                for ch, seg in zip(text, _linear_segments(dur_cs, len(text))):
+                    tokens.append([seg, ch])
+            elif granularity == "word" and word_token is not None and prev.is_part_of_word:
+                word_token[0] += dur_cs
+                word_token[1] += text
+            else:
+                word_token = [dur_cs, text]
+                tokens.append(word_token)
+        prev = s
+    return tokens
 
 
 def _has_non_latin(line: Line) -> bool:
@@ -137,35 +186,82 @@ def _event_header() -> str:
     return "Format: Layer,Start,End,Style,Name,MarginL,MarginR,MarginV,Effect,Text"
 
 
-def _dialogue_line(layer: int, start: float, end: float, style: StyleConfig, text: str) -> str:
-    return ",".join(
-        [
-            f"Dialogue: {layer}",
-            _format_time(start),
-            _format_time(end),
-            style.name,
-            "",
-            str(style.margin_l),
-            str(style.margin_r),
-            str(style.margin_v),
-            "",
-            text,
-        ]
-    )
+def _event_fields(style: StyleConfig) -> str:
+    return ",".join([style.name, "", str(style.margin_l), str(style.margin_r), str(style.margin_v), ""])
 
 
-def _override_tag(style: StyleConfig, x: int, y: int) -> str:
-    parts = [f"\\pos({x},{y})"]
+def _fade_tag(style: StyleConfig) -> str:
     fade_in = int(round(max(0.0, style.fade_in_ms)))
     fade_out = int(round(max(0.0, style.fade_out_ms)))
     if fade_in or fade_out:
-        parts.append(f"\\fad({fade_in},{fade_out})")
-    return "{" + "".join(parts) + "}"
+        return f"\\fad({fade_in},{fade_out})"
+    return ""
+
+
+@dataclass(frozen=True)
+class CompiledStyle:
+    style: StyleConfig
+    x: int
+    y: int
+    fade_out_cs: int
+    fade_tag: str
+    event_fields: str
+    original_offset: int
+    padding: int
+
+
+@dataclass(frozen=True)
+class CompiledConfig:
+    config: AssConfig
+    current_lower: CompiledStyle
+    current_upper: CompiledStyle
+    original_lower: Optional[CompiledStyle]
+    original_upper: Optional[CompiledStyle]
+    background: Optional[CompiledStyle]
+    background_padding: int
+    show_before_cs: int
+    header: Tuple[str, ...]
+
+
+class LeadMeta(NamedTuple):
+    has_romanized: bool
+    non_latin: bool
+    use_romanized: bool
+    lane: int
+    current_style: CompiledStyle
+    display_start_cs: int
+    current_end_cs: int
+    original_style: Optional[CompiledStyle]
+    original_end_cs: int
+
+    @property
+    def display_end_cs(self) -> int:
+        return max(self.current_end_cs, self.original_end_cs)
+
+
+def _compile_style(style: StyleConfig, config: AssConfig) -> CompiledStyle:
+    return CompiledStyle(
+        style=style,
+        x=_anchor_x(style, config),
+        y=_anchor_y(style, config),
+        fade_out_cs=int(round(max(0.0, style.fade_out_ms) / 10)),
+        fade_tag=_fade_tag(style),
+        event_fields=_event_fields(style),
+        original_offset=max(8, int(round(style.fontsize * 0.6))),
+        padding=max(10, int(round(style.fontsize * 0.4))),
+    )
+
 
+def _dialogue_line(layer: int, start_cs: int, end_cs: int, style: CompiledStyle, text: str) -> str:
+    return f"Dialogue: {layer},{_format_time(start_cs)},{_format_time(end_cs)},{style.event_fields},{text}"
 
-def _end_with_fade(end: float, style: StyleConfig) -> float:
-    fade_out_s = max(0.0, style.fade_out_ms) / 1000.0
-    return end + fade_out_s
+
+def _override_tag(style: CompiledStyle, x: int, y: int) -> str:
+    return f"{{\\pos({x},{y}){style.fade_tag}}}"
+
+
+def _end_with_fade(end_cs: int, style: CompiledStyle) -> int:
+    return end_cs + style.fade_out_cs
 
 
 def _get_style(styles: dict[str, StyleConfig], *keys: str) -> StyleConfig:
@@ -175,7 +271,206 @@ def _get_style(styles: dict[str, StyleConfig], *keys: str) -> StyleConfig:
     raise KeyError("No matching style keys found")
 
 
-def generate_ass(lyrics: Lyrics, config: AssConfig) -> str:
+class _OriginalIndex:
+    def __init__(self, spans: Iterable[Tuple[int, int, int]]) -> None:
+        groups: dict[int, List[Tuple[int, int]]] = {}
+        for start, end, y in spans:
+            groups.setdefault(y, []).append((start, end))
+        self._groups: List[Tuple[int, List[int], List[int]]] = []
+        for y in sorted(groups):
+            ordered = sorted(groups[y])
+            starts = [start for start, _ in ordered]
+            max_ends = list(accumulate((end for _, end in ordered), max))
+            self._groups.append((y, starts, max_ends))
+
+    def min_y(self, start: int, end: int) -> Optional[int]:
+        for y, starts, max_ends in self._groups:
+            count = bisect_left(starts, end)
+            if count and max_ends[count - 1] > start:
+                return y
+        return None
+
+
+class _IntervalIndex:
+    def __init__(self, intervals: List[Tuple[int, int]]) -> None:
+        self._order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+        self._starts = [intervals[i][0] for i in self._order]
+        self._ends = [intervals[i][1] for i in self._order]
+        self._max_ends = list(accumulate(self._ends, max))
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        hi = bisect_left(self._starts, end)
+        lo = bisect_right(self._max_ends, start, 0, hi)
+        return sorted(self._order[k] for k in range(lo, hi) if self._ends[k] > start)
+
+
+class _ActiveSlots:
+    def __init__(self) -> None:
+        self._step = 0
+        self._query_steps: List[int] = []
+        self._query_starts: List[int] = []
+        self._heap: List[Tuple[int, int, int]] = []
+
+    def highest(self, start: int) -> Optional[int]:
+        self._step += 1
+        while self._query_starts and self._query_starts[-1] <= start:
+            self._query_starts.pop()
+            self._query_steps.pop()
+        self._query_steps.append(self._step)
+        self._query_starts.append(start)
+        while self._heap:
+            y, added, end = self._heap[0]
+            expired_by = self._query_starts[bisect_right(self._query_steps, added)]
+            if end > expired_by:
+                return y
+            heapq.heappop(self._heap)
+        return None
+
+    def add(self, end: int, y: int) -> None:
+        heapq.heappush(self._heap, (y, self._step, end))
+
+
+def _adjacent_below(line_list: List[Line], meta: List[LeadMeta]) -> Dict[int, List[int]]:
+    below: Dict[int, List[int]] = {}
+    bottom_lane = 1
+    for idx, line in enumerate(line_list):
+        if meta[idx].lane == bottom_lane:
+            continue
+        for other in (idx - 1, idx + 1):
+            if other < 0 or other >= len(line_list) or meta[other].lane != bottom_lane:
+                continue
+            if meta[other].display_start_cs >= line.end_cs or line_list[other].end_cs <= meta[idx].display_start_cs:
+                continue
+            below[idx] = [other]
+            break
+    return below
+
+
+def _lanes_below(line_list: List[Line], meta: List[LeadMeta]) -> Dict[int, List[int]]:
+    below: Dict[int, List[int]] = {}
+    active: List[Tuple[int, int]] = []
+    for idx in sorted(range(len(line_list)), key=lambda i: meta[i].display_start_cs):
+        start = meta[idx].display_start_cs
+        end = line_list[idx].end_cs
+        lane = meta[idx].lane
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other in active:
+            other_lane = meta[other].lane
+            if other_lane == lane or end <= meta[other].display_start_cs:
+                continue
+            if other_lane > lane:
+                below.setdefault(idx, []).append(other)
+            else:
+                below.setdefault(other, []).append(idx)
+        heapq.heappush(active, (end, idx))
+    return below
+
+
+def _line_key(line: Line, romaji: Optional[Tuple[Optional[str], ...]] = None) -> tuple:
+    return (
+        line.start_cs,
+        line.end_cs,
+        tuple((s.text, s.start_cs, s.end_cs, s.is_part_of_word, s.romanized) for s in line.syllables),
+        romaji,
+    )
+
+
+@dataclass
+class PreparedLyrics:
+    lyrics: Lyrics
+    lead_romaji: List[Optional[Tuple[Optional[str], ...]]]
+    lead_has_romanized: List[bool]
+    lead_non_latin: List[bool]
+    texts: Optional[Dict[tuple, str]] = None
+
+    def karaoke_text(
+        self,
+        key: tuple,
+        line: Line,
+        use_romanized: bool,
+        offset_cs: int,
+        granularity: str,
+        romaji: Optional[Tuple[Optional[str], ...]] = None,
+    ) -> str:
+        if self.texts is None:
+            text = _build_text(line.syllables, use_romanized, karaoke=True, granularity=granularity, romaji=romaji)
+        else:
+            memo_key = (key, use_romanized, granularity)
+            text = self.texts.get(memo_key)
+            if text is None:
+                text = _build_text(line.syllables, use_romanized, karaoke=True, granularity=granularity, romaji=romaji)
+                self.texts[memo_key] = text
+        return f"{{\\k{offset_cs}}}{text}" if offset_cs > 0 else text
+
+
+def prepare_lyrics(
+    lyrics: Lyrics | PreparedLyrics,
+    romaji: Optional[RomajiOverlay] = None,
+    memoize: bool = False,
+) -> PreparedLyrics:
+    if isinstance(lyrics, PreparedLyrics):
+        return lyrics
+    lines = lyrics.lead_lines
+    overlay = romaji.lead if romaji else {}
+    lead_romaji = [overlay.get(idx) for idx in range(len(lines))] if overlay else [None] * len(lines)
+    lead_has_romanized = [
+        any(s.romanized for s in line.syllables) if line_romaji is None else any(line_romaji)
+        for line, line_romaji in zip(lines, lead_romaji)
+    ]
+    return PreparedLyrics(
+        lyrics=lyrics,
+        lead_romaji=lead_romaji,
+        lead_has_romanized=lead_has_romanized,
+        lead_non_latin=[_has_non_latin(line) for line in lines],
+        texts={} if memoize else None,
+    )
+
+
+def _lead_events(
+    prepared: PreparedLyrics,
+    idx: int,
+    line: Line,
+    romaji: Optional[Tuple[Optional[str], ...]],
+    entry: LeadMeta,
+    x: int,
+    y: int,
+    granularity: str,
+) -> List[str]:
+    current_style = entry.current_style
+    original_style = entry.original_style
+    display_start = entry.display_start_cs
+    offset_cs = line.start_cs - display_start
+    current_text = prepared.karaoke_text(("lead", idx), line, entry.use_romanized, offset_cs, granularity, romaji)
+    current_text = f"{_override_tag(current_style, x, y)}{current_text}"
+    events = [_dialogue_line(1, display_start, entry.current_end_cs, current_style, current_text)]
+
+    if original_style:
+        original_text = prepared.karaoke_text(("lead", idx), line, False, offset_cs, granularity)
+        original_y = max(y + original_style.original_offset, original_style.y)
+        original_text = f"{_override_tag(original_style, x, original_y)}{original_text}"
+        events.append(_dialogue_line(2, display_start, entry.original_end_cs, original_style, original_text))
+    return events
+
+
+def _background_event(
+    prepared: PreparedLyrics,
+    idx: int,
+    line: Line,
+    start_cs: int,
+    end_cs: int,
+    style: CompiledStyle,
+    x: int,
+    y: int,
+    granularity: str,
+) -> List[str]:
+    text = prepared.karaoke_text(("background", idx), line, False, line.start_cs - start_cs, granularity)
+    return [_dialogue_line(3, start_cs, end_cs, style, f"{_override_tag(style, x, y)}{text}")]
+
+
+def compile_config(config: AssConfig | CompiledConfig) -> CompiledConfig:
+    if isinstance(config, CompiledConfig):
+        return config
     styles = config.styles
     current_lower = _get_style(
         styles,
@@ -207,18 +502,18 @@ def generate_ass(lyrics: Lyrics, config: AssConfig) -> str:
     )
     background_style = styles.get("background") or styles.get("original_top")
 
-    out: List[str] = []
-    out.append("[Script Info]")
-    out.append("ScriptType: v4.00+")
-    out.append(f"PlayResX: {config.play_res_x}")
-    out.append(f"PlayResY: {config.play_res_y}")
-    out.append("ScaledBorderAndShadow: yes")
-    out.append(f"WrapStyle: {config.wrap_style}")
-    out.append("Timer: 100.0000")
-    out.append("")
-
-    out.append("[V4+ Styles]")
-    out.append(_style_header())
+    header = [
+        "[Script Info]",
+        "ScriptType: v4.00+",
+        f"PlayResX: {config.play_res_x}",
+        f"PlayResY: {config.play_res_y}",
+        "ScaledBorderAndShadow: yes",
+        f"WrapStyle: {config.wrap_style}",
+        "Timer: 100.0000",
+        "",
+        "[V4+ Styles]",
+        _style_header(),
+    ]
     style_list = [current_lower, current_upper]
     if original_below_lower:
         style_list.append(original_below_lower)
@@ -231,52 +526,89 @@ def generate_ass(lyrics: Lyrics, config: AssConfig) -> str:
         if style.name in seen:
             continue
         seen.add(style.name)
-        out.append(f"Style: {ass_style_line(style)}")
-    out.append("")
+        header.append(f"Style: {ass_style_line(style)}")
+    header.append("")
+    header.append("[Events]")
+    header.append(_event_header())
+
+    def compiled(style: Optional[StyleConfig]) -> Optional[CompiledStyle]:
+        return _compile_style(style, config) if style else None
+
+    return CompiledConfig(
+        config=config,
+        current_lower=compiled(current_lower),
+        current_upper=compiled(current_upper),
+        original_lower=compiled(original_below_lower),
+        original_upper=compiled(original_below_upper),
+        background=compiled(background_style),
+        background_padding=max(10, int(round(background_style.fontsize * 0.9))) if background_style else 0,
+        show_before_cs=int(round(config.next_show_before_seconds * 100)),
+        header=tuple(header),
+    )
 
-    out.append("[Events]")
-    out.append(_event_header())
 
+@dataclass(frozen=True)
+class AssLayout:
+    compiled: CompiledConfig
+    prepared: PreparedLyrics
+    lead_lines: List[Line]
+    lead_romaji: List[Optional[Tuple[Optional[str], ...]]]
+    lead_meta: List[LeadMeta]
+    lead_positions: List[Tuple[int, int]]
+    background: List[Tuple[Line, int, int, int, int]]
+
+
+def layout_ass(
+    lyrics: Lyrics | PreparedLyrics,
+    config: AssConfig | CompiledConfig,
+    romaji: Optional[RomajiOverlay] = None,
+) -> AssLayout:
+    prepared = prepare_lyrics(lyrics, romaji)
+    lyrics = prepared.lyrics
+    compiled = compile_config(config)
+    config = compiled.config
+    current_lower = compiled.current_lower
+    current_upper = compiled.current_upper
+    original_below_lower = compiled.original_lower
+    original_below_upper = compiled.original_upper
+    background_style = compiled.background
+
+    show_before_cs = compiled.show_before_cs
     line_list = list(lyrics.lead_lines)
-    meta = []
-    use_upper = True
-    last_end_top = 0.0
-    last_end_bottom = 0.0
+    lead_romaji = prepared.lead_romaji
+    lanes = config.lanes
+    bottom_lane = lanes - 1
+    lane_ends = [0] * lanes
+    lane = 0
+    meta: List[LeadMeta] = []
     for idx, line in enumerate(line_list):
-        has_romanized = any(s.romanized for s in line.syllables)
-        non_latin = _has_non_latin(line)
+        has_romanized = prepared.lead_has_romanized[idx]
+        non_latin = prepared.lead_non_latin[idx]
         use_romanized = non_latin and has_romanized
-        display_start = max(0.0, line.start - config.next_show_before_seconds)
+        display_start = max(0, line.start_cs - show_before_cs)
         if idx > 0:
-            gap = line.start - line_list[idx - 1].end
-            if gap > config.next_show_before_seconds:
-                use_upper = True
+            gap = line.start_cs - line_list[idx - 1].end_cs
+            if gap > show_before_cs:
+                lane = 0
             elif config.alternate_positions:
-                use_upper = not use_upper
+                lane = (lane + 1) % lanes
+        use_upper = lane != bottom_lane
         current_style = current_upper if use_upper else current_lower
-        if use_upper:
-            display_start = max(display_start, last_end_top)
-        else:
-            display_start = max(display_start, last_end_bottom)
+        display_start = max(display_start, lane_ends[lane])
 
         original_style = None
         if non_latin and has_romanized:
             original_style = original_below_upper if use_upper else original_below_lower
-        current_end = _end_with_fade(line.end, current_style)
-        original_end = _end_with_fade(line.end, original_style) if original_style else line.end
-        effective_end = max(current_end, original_end)
-
-        if use_upper:
-            last_end_top = max(last_end_top, effective_end)
-        else:
-            last_end_bottom = max(last_end_bottom, effective_end)
+        current_end = _end_with_fade(line.end_cs, current_style)
+        original_end = _end_with_fade(line.end_cs, original_style) if original_style else line.end_cs
+        lane_ends[lane] = max(lane_ends[lane], current_end, original_end)
 
         meta.append(
-            (
+            LeadMeta(
                 has_romanized,
                 non_latin,
                 use_romanized,
-                use_upper,
+                lane,
                 current_style,
                 display_start,
                 current_end,
@@ -285,116 +617,163 @@ def generate_ass(lyrics: Lyrics, config: AssConfig) -> str:
             )
         )
 
-    for idx, line in enumerate(line_list):
-        (
-            has_romanized,
-            non_latin,
-            use_romanized,
-            use_upper,
-            current_style,
-            display_start,
-            current_end,
-            original_style,
-            original_end,
-        ) = meta[idx]
-        offset_cs = int(round((line.start - display_start) * 100))
-
-        base_x = _anchor_x(current_style, config)
-        base_y = _anchor_y(current_style, config)
-        original_offset = _original_offset(original_style)
-        adjusted_y = base_y
-
-        if use_upper:
-            for neighbor in (idx - 1, idx + 1):
-                if neighbor < 0 or neighbor >= len(line_list):
-                    continue
-                (
-                    n_has_romanized,
-                    n_non_latin,
-                    _,
-                    n_use_upper,
-                    n_style,
-                    n_display_start,
-                    _,
-                    n_original_style,
-                    _,
-                ) = meta[neighbor]
-                if n_use_upper:
-                    continue
-                n_line = line_list[neighbor]
-                if n_display_start >= line.end or n_line.end <= display_start:
-                    continue
-                n_base_y = _anchor_y(n_style, config)
-                n_top = n_base_y - n_style.fontsize
-                padding = max(10, int(round(current_style.fontsize * 0.4)))
-                adjusted_y = min(adjusted_y, n_top - padding - original_offset)
-                break
-
-        current_text = _build_text(
-            line.syllables,
-            use_romanized,
-            karaoke=True,
-            start_offset_cs=offset_cs,
-        )
-        current_text = f"{_override_tag(current_style, base_x, adjusted_y)}{current_text}"
-        out.append(_dialogue_line(1, display_start, current_end, current_style, current_text))
-
-        if original_style:
-            original_base_y = _anchor_y(original_style, config)
-            original_text = _build_text(
-                line.syllables,
-                False,
-                karaoke=True,
-                start_offset_cs=offset_cs,
-            )
-            original_y = max(adjusted_y + original_offset, original_base_y)
-            original_text = f"{_override_tag(original_style, base_x, original_y)}{original_text}"
-            out.append(_dialogue_line(2, display_start, original_end, original_style, original_text))
-
+    below = _adjacent_below(line_list, meta) if lanes == 2 else _lanes_below(line_list, meta)
+    ys = [0] * len(line_list)
+    for idx in sorted(range(len(line_list)), key=lambda i: meta[i].lane, reverse=True):
+        current_style = meta[idx].current_style
+        adjusted_y = current_style.y
+        if meta[idx].lane != bottom_lane:
+            original_offset = _original_offset(meta[idx].original_style)
+            for other in below.get(idx, ()):
+                n_top = ys[other] - meta[other].current_style.style.fontsize
+                adjusted_y = min(adjusted_y, n_top - current_style.padding - original_offset)
+        ys[idx] = adjusted_y
+    positions = [(m.current_style.x, y) for m, y in zip(meta, ys)]
+
+    background = []
     if background_style:
-        active_bg: List[tuple[float, int]] = []
+        original_index = _OriginalIndex(
+            (line.start_cs, line.end_cs, m.original_style.y)
+            for line, m in zip(line_list, meta)
+            if m.non_latin and m.has_romanized and m.original_style
+        )
+        active_bg = _ActiveSlots()
+        padding = compiled.background_padding
         for bg_line in lyrics.background_lines:
-            bg_start = max(0.0, bg_line.start - config.next_show_before_seconds)
-            bg_end = _end_with_fade(bg_line.end, background_style)
-            offset_cs = int(round((bg_line.start - bg_start) * 100))
-            bg_text = _build_text(bg_line.syllables, False, karaoke=True, start_offset_cs=offset_cs)
-            bg_x = _anchor_x(background_style, config)
-            bg_y = _anchor_y(background_style, config)
-            padding = max(10, int(round(background_style.fontsize * 0.9)))
-            active_bg = [(end, y) for end, y in active_bg if end > bg_start]
-            for idx, lead_line in enumerate(line_list):
-                if lead_line.end <= bg_start or lead_line.start >= bg_line.end:
-                    continue
-                (
-                    has_romanized,
-                    non_latin,
-                    _,
-                    use_upper,
-                    _,
-                    _,
-                    _,
-                    original_style,
-                    _,
-                ) = meta[idx]
-                if not (non_latin and has_romanized):
-                    continue
-                if not original_style:
-                    continue
-                original_y = _anchor_y(original_style, config)
+            bg_start = max(0, bg_line.start_cs - show_before_cs)
+            bg_end = _end_with_fade(bg_line.end_cs, background_style)
+            bg_y = background_style.y
+            original_y = original_index.min_y(bg_start, bg_line.end_cs)
+            if original_y is not None:
                 bg_y = min(bg_y, original_y - padding)
-            if active_bg:
-                highest_y = min(y for _, y in active_bg)
+            highest_y = active_bg.highest(bg_start)
+            if highest_y is not None:
                 bg_y = min(bg_y, highest_y - padding)
             bg_y = max(0, bg_y)
-            out.append(
-                _dialogue_line(
-                    3,
-                    bg_start,
-                    bg_end,
-                    background_style,
-                    f"{_override_tag(background_style, bg_x, bg_y)}{bg_text}",
-                )
+            background.append((bg_line, bg_start, bg_end, background_style.x, bg_y))
+            active_bg.add(bg_end, bg_y)
+
+    return AssLayout(
+        compiled=compiled,
+        prepared=prepared,
+        lead_lines=line_list,
+        lead_romaji=lead_romaji,
+        lead_meta=meta,
+        lead_positions=positions,
+        background=background,
+    )
+
+
+def _event_lines(
+    layout: AssLayout,
+    cache: Optional[EventCache] = None,
+    lead_indices: Optional[Iterable[int]] = None,
+    background_indices: Optional[Iterable[int]] = None,
+) -> Iterator[str]:
+    granularity = layout.compiled.config.karaoke_granularity
+    prepared = layout.prepared
+    if lead_indices is None:
+        lead_indices = range(len(layout.lead_lines))
+    if background_indices is None:
+        background_indices = range(len(layout.background))
+    for idx in lead_indices:
+        line = layout.lead_lines[idx]
+        romaji = layout.lead_romaji[idx]
+        entry = layout.lead_meta[idx]
+        x, y = layout.lead_positions[idx]
+        if cache is None:
+            yield from _lead_events(prepared, idx, line, romaji, entry, x, y, granularity)
+        else:
+            key = ("lead", _line_key(line, romaji), tuple(entry), x, y, granularity)
+            yield from cache.lookup(
+                key,
+                lambda: _lead_events(prepared, idx, line, romaji, entry, x, y, granularity),
             )
-            active_bg.append((bg_end, bg_y))
 
-    return "\n".join(out) + "\n"
+    style = layout.compiled.background
+    for idx in background_indices:
+        bg_line, bg_start, bg_end, bg_x, bg_y = layout.background[idx]
+        if cache is None:
+            yield from _background_event(prepared, idx, bg_line, bg_start, bg_end, style, bg_x, bg_y, granularity)
+        else:
+            key = ("background", _line_key(bg_line), bg_start, bg_end, style, bg_x, bg_y, granularity)
+            yield from cache.lookup(
+                key,
+                lambda: _background_event(prepared, idx, bg_line, bg_start, bg_end, style, bg_x, bg_y, granularity),
+            )
+
+
+def iter_layout(layout: AssLayout, cache: Optional[EventCache] = None) -> Iterator[str]:
+    for line in layout.compiled.header:
+        yield line + "\n"
+    for line in _event_lines(layout, cache):
+        yield line + "\n"
+
+
+class LayoutIndex:
+    def __init__(self, layout: AssLayout) -> None:
+        self.layout = layout
+        self._lead = _IntervalIndex([(m.display_start_cs, m.display_end_cs) for m in layout.lead_meta])
+        self._background = _IntervalIndex([(start, end) for _, start, end, _, _ in layout.background])
+
+    def window(self, start_cs: int, end_cs: int) -> Tuple[List[int], List[int]]:
+        return self._lead.overlapping(start_cs, end_cs), self._background.overlapping(start_cs, end_cs)
+
+
+def iter_window(
+    index: LayoutIndex,
+    start_cs: int,
+    end_cs: int,
+    cache: Optional[EventCache] = None,
+) -> Iterator[str]:
+    lead_indices, background_indices = index.window(start_cs, end_cs)
+    for line in index.layout.compiled.header:
+        yield line + "\n"
+    for line in _event_lines(index.layout, cache, lead_indices, background_indices):
+        yield line + "\n"
+
+
+def iter_ass(
+    lyrics: Lyrics | PreparedLyrics,
+    config: AssConfig | CompiledConfig,
+    cache: Optional[EventCache] = None,
+    romaji: Optional[RomajiOverlay] = None,
+) -> Iterator[str]:
+    return iter_layout(layout_ass(lyrics, config, romaji), cache)
+
+
+def write_ass(
+    lyrics: Lyrics | PreparedLyrics,
+    config: AssConfig | CompiledConfig,
+    stream: TextIO,
+    cache: Optional[EventCache] = None,
+    romaji: Optional[RomajiOverlay] = None,
+) -> None:
+    stream.writelines(iter_ass(lyrics, config, cache, romaji))
+
+
+def generate_ass(
+    lyrics: Lyrics | PreparedLyrics,
+    config: AssConfig | CompiledConfig,
+    romaji: Optional[RomajiOverlay] = None,
+) -> str:
+    return "".join(iter_ass(lyrics, config, romaji=romaji))
+
+
+def karaoke_size_report(
+    lyrics: Lyrics | PreparedLyrics,
+    config: AssConfig | CompiledConfig,
+    romaji: Optional[RomajiOverlay] = None,
+) -> dict[str, dict[str, int]]:
+    layout = layout_ass(lyrics, config, romaji)
+    compiled = layout.compiled
+    report = {}
+    for granularity in KARAOKE_GRANULARITIES:
+        size = 0
+        blocks = 0
+        variant = replace(compiled, config=replace(compiled.config, karaoke_granularity=granularity))
+        for line in iter_layout(replace(layout, compiled=variant)):
+            size += len(line.encode("utf-8"))
+            blocks += len(_OVERRIDE_BLOCK.findall(line))
+        report[granularity] = {"bytes": size, "override_blocks": blocks}
+    return report
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from .ass_writer import CompiledConfig, compile_config
+from .config import load_config
+from .generator import render_file
+from .romanize import use_cache
+
+LYRIC_FILENAME = "lyric.json"
+
+_worker_config: Optional[CompiledConfig] = None
+_worker_incremental = False
+_worker_lyrics_cache = False
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    input_path: str
+    output_path: str
+    seconds: float
+    error: Optional[str] = None
+    changed: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def find_lyrics(pattern: str) -> List[str]:
+    root = Path(pattern)
+    if root.is_dir():
+        return sorted(str(p) for p in root.rglob(LYRIC_FILENAME))
+    return sorted(glob.glob(pattern, recursive=True))
+
+
+def output_path_for(input_path: str) -> str:
+    return str(Path(input_path).with_suffix(".ass"))
+
+
+def _init_worker(
+    config_path: Optional[str],
+    romanize_cache: Optional[str] = None,
+    incremental: bool = False,
+    lyrics_cache: bool = False,
+) -> None:
+    global _worker_config, _worker_incremental, _worker_lyrics_cache
+    _worker_config = compile_config(load_config(config_path))
+    _worker_incremental = incremental
+    _worker_lyrics_cache = lyrics_cache
+    if romanize_cache:
+        use_cache(romanize_cache)
+
+
+def _render_one(input_path: str) -> BatchResult:
+    output_path = output_path_for(input_path)
+    started = time.perf_counter()
+    try:
+        changed = render_file(
+            input_path,
+            output_path,
+            _worker_config,
+            _worker_incremental,
+            lyrics_cache=_worker_lyrics_cache,
+        )
+    except Exception as exc:
+        elapsed = time.perf_counter() - started
+        return BatchResult(input_path, output_path, elapsed, f"{type(exc).__name__}: {exc}")
+    return BatchResult(input_path, output_path, time.perf_counter() - started, changed=changed)
+
+
+def render_batch(
+    input_paths: Sequence[str],
+    config_path: Optional[str],
+    jobs: Optional[int] = None,
+    romanize_cache: Optional[str] = None,
+    incremental: bool = False,
+    lyrics_cache: bool = False,
+) -> List[BatchResult]:
+    load_config(config_path)
+    if jobs == 1 or len(input_paths) <= 1:
+        _init_worker(config_path, romanize_cache, incremental, lyrics_cache)
+        return [_render_one(p) for p in input_paths]
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(config_path, romanize_cache, incremental, lyrics_cache),
+    ) as pool:
+        return list(pool.map(_render_one, input_paths))
+
+
+def format_result(r: BatchResult) -> str:
+    if r.ok:
+        status = "OK  " if r.changed else "SAME"
+        return f"{status} {r.seconds:7.3f}s  {r.input_path} -> {r.output_path}"
+    return f"FAIL {r.seconds:7.3f}s  {r.input_path}: {r.error}"
+
+
+def format_totals(succeeded: int, changed: int, failed: int, seconds: float) -> str:
+    return f"{succeeded} succeeded ({changed} changed), {failed} failed, {seconds:.3f}s total render time"
+
+
+def format_summary(results: Sequence[BatchResult]) -> str:
+    lines = [format_result(r) for r in results]
+    failed = sum(1 for r in results if not r.ok)
+    changed = sum(1 for r in results if r.changed)
+    total = sum(r.seconds for r in results)
+    lines.append(format_totals(len(results) - failed, changed, failed, total))
+    return "\n".join(lines)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import re
+import sys
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Set, Union
+
+from .ass_writer import CompiledConfig, compile_config
+from .batch import BatchResult
+from .config import AssConfig
+from .generator import render_lyrics
+from .parser import parse_query, select_query
+
+STDIN = "-"
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def song_name(query: dict, number: int) -> str:
+    song_id = query.get("result", {}).get("data", {}).get("id")
+    name = _UNSAFE.sub("_", str(song_id)).strip("._") if song_id else ""
+    return name or f"record-{number}"
+
+
+def _unique_name(name: str, used: Set[str]) -> str:
+    candidate = name
+    suffix = 1
+    while candidate in used:
+        suffix += 1
+        candidate = f"{name}-{suffix}"
+    used.add(candidate)
+    return candidate
+
+
+def render_records(
+    lines: Iterable[Union[str, bytes]],
+    output_dir: str,
+    config: AssConfig | CompiledConfig,
+    operation_id: Optional[str] = None,
+    operation: Optional[str] = None,
+    incremental: bool = False,
+    source: str = "catalog",
+) -> Iterator[BatchResult]:
+    config = compile_config(config)
+    root = Path(output_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    used: Set[str] = set()
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        started = time.perf_counter()
+        label = f"{source}:{number}"
+        output_path = ""
+        try:
+            raw = json.loads(line)
+            query = select_query(raw, operation_id, operation)
+            output_path = str(root / f"{_unique_name(song_name(query, number), used)}.ass")
+            lyrics = parse_query(query)
+            changed = render_lyrics(lyrics, output_path, config, incremental)
+        except Exception as exc:
+            elapsed = time.perf_counter() - started
+            yield BatchResult(label, output_path, elapsed, f"{type(exc).__name__}: {exc}")
+            continue
+        yield BatchResult(label, output_path, time.perf_counter() - started, changed=changed)
+
+
+def render_catalog(
+    catalog_path: str,
+    output_dir: str,
+    config: AssConfig | CompiledConfig,
+    operation_id: Optional[str] = None,
+    operation: Optional[str] = None,
+    incremental: bool = False,
+) -> Iterator[BatchResult]:
+    opened = nullcontext(sys.stdin.buffer) if catalog_path == STDIN else open(catalog_path, "rb")
+    with opened as f:
+        yield from render_records(f, output_dir, config, operation_id, operation, incremental, catalog_path)
@@ -1,15 +1,221 @@
 from __future__ import annotations
 
 import argparse
+import sys
 
 from .generator import generate
 
+STDERR = "-"
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Generate karaoke .ass from lyric.json")
-    parser.add_argument("-i", "--input", required=True, help="Path to lyric.json")
-    parser.add_argument("-o", "--output", required=True, help="Path to output .ass")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-i", "--input", help="Path to lyric.json")
+    source.add_argument(
+        "--input-dir",
+        help="Directory (searched recursively for lyric.json) or glob pattern for batch mode",
+    )
+    source.add_argument(
+        "--catalog",
+        help="JSONL file ('-' for stdin) with one lyrics API response per line; -o names the output directory",
+    )
+    source.add_argument(
+        "--serve",
+        action="store_true",
+        help="Stay running and render JSONL jobs from stdin (or --socket), replying with one JSON line per job",
+    )
+    parser.add_argument("-o", "--output", help="Path to output .ass ('-' for stdout)")
     parser.add_argument("--config", default=None, help="Path to JSON config")
+    parser.add_argument(
+        "--format",
+        default=None,
+        help="Comma-separated output formats written next to --output from one shared layout: ass, lrc, vtt, ttml",
+    )
+    parser.add_argument(
+        "--target",
+        nargs=2,
+        action="append",
+        metavar=("CONFIG", "OUTPUT"),
+        help="Render --input once per config into OUTPUT, sharing parsing and romanization (repeatable)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for batch mode (default: CPU count)",
+    )
+    parser.add_argument(
+        "--romanize-cache",
+        default=None,
+        help="Path to a SQLite file caching romaji across runs and workers",
+    )
+    parser.add_argument("--operation-id", default=None, help="Pick the query with this operationId in --catalog records")
+    parser.add_argument("--operation", default=None, help="Pick the query with this operation in --catalog records")
+    parser.add_argument("--socket", default=None, help="Unix socket path to listen on with --serve")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse rendered events for unchanged lines from a cache file next to the output",
+    )
+    parser.add_argument(
+        "--lyrics-cache",
+        action="store_true",
+        help="Reuse parsed lyrics from a binary cache file next to each input",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=STDERR,
+        default=None,
+        help="Write a JSON report of per-stage timings and counters to this path (default: stderr)",
+    )
+    parser.add_argument(
+        "--from",
+        dest="window_from",
+        type=float,
+        default=None,
+        help="Only render events visible at or after this time in seconds",
+    )
+    parser.add_argument(
+        "--to",
+        dest="window_to",
+        type=float,
+        default=None,
+        help="Only render events visible before this time in seconds",
+    )
+    parser.add_argument(
+        "--karaoke-report",
+        action="store_true",
+        help="Print output size and override-block counts per karaoke granularity instead of rendering",
+    )
     args = parser.parse_args()
 
-    generate(args.input, args.output, args.config)
+    if args.input_dir:
+        from .batch import find_lyrics, format_summary, render_batch
+
+        paths = find_lyrics(args.input_dir)
+        if not paths:
+            parser.error(f"No lyric files found for {args.input_dir}")
+        results = render_batch(
+            paths,
+            args.config,
+            args.jobs,
+            args.romanize_cache,
+            args.incremental,
+            args.lyrics_cache,
+        )
+        print(format_summary(results))
+        if not all(r.ok for r in results):
+            sys.exit(1)
+        return
+
+    if args.romanize_cache:
+        from .romanize import use_cache
+
+        use_cache(args.romanize_cache)
+
+    if args.catalog:
+        from .batch import format_result, format_totals
+        from .catalog import render_catalog
+        from .config import load_config
+
+        if not args.output:
+            parser.error("--output (directory) is required with --catalog")
+        succeeded = changed = failed = 0
+        seconds = 0.0
+        for r in render_catalog(
+            args.catalog,
+            args.output,
+            load_config(args.config),
+            args.operation_id,
+            args.operation,
+            args.incremental,
+        ):
+            print(format_result(r), flush=True)
+            succeeded += r.ok
+            changed += r.changed
+            failed += not r.ok
+            seconds += r.seconds
+        print(format_totals(succeeded, changed, failed, seconds))
+        if failed:
+            sys.exit(1)
+        return
+
+    if args.serve:
+        from .server import serve
+
+        serve(args.socket, args.config, args.incremental, args.lyrics_cache)
+        return
+
+    if args.karaoke_report:
+        import json
+
+        from .ass_writer import karaoke_size_report
+        from .config import load_config
+        from .parser import load_lyrics
+        from .romanize import auto_romanize
+
+        config = load_config(args.config)
+        lyrics = auto_romanize(load_lyrics(args.input), mode=config.romanize_mode)
+        print(json.dumps(karaoke_size_report(lyrics, config), indent=2))
+        return
+
+    if args.target and args.output:
+        parser.error("--target and --output cannot be combined")
+    if not args.output and not args.target:
+        parser.error("--output is required with --input")
+    window = None
+    if args.window_from is not None or args.window_to is not None:
+        if args.target:
+            parser.error("--from/--to cannot be combined with --target")
+        start_cs = int(round((args.window_from or 0.0) * 100))
+        end_cs = sys.maxsize if args.window_to is None else int(round(args.window_to * 100))
+        if end_cs <= start_cs:
+            parser.error("--to must be later than --from")
+        window = (start_cs, end_cs)
+    profiler = None
+    if args.profile:
+        import json
+
+        from .profiling import Profiler
+
+        profiler = Profiler()
+    formats = None
+    if args.format:
+        from .formats import parse_formats
+
+        try:
+            formats = parse_formats(args.format)
+        except ValueError as exc:
+            parser.error(str(exc))
+        if args.target or window or args.incremental or args.output == "-":
+            parser.error("--format cannot be combined with --target, --from/--to, --incremental or --output -")
+
+    if formats:
+        from .generator import generate_formats
+
+        generate_formats(args.input, args.output, args.config, formats, profiler, args.lyrics_cache)
+    elif args.target:
+        from .generator import generate_targets
+
+        targets = [(config_path or None, output_path) for config_path, output_path in args.target]
+        generate_targets(args.input, targets, args.incremental, profiler, args.lyrics_cache)
+    else:
+        generate(
+            args.input,
+            args.output,
+            args.config,
+            args.incremental,
+            profiler,
+            args.lyrics_cache,
+            window,
+        )
+    if profiler:
+        report = json.dumps(profiler.report(), indent=2)
+        if args.profile == STDERR:
+            print(report, file=sys.stderr)
+        else:
+            with open(args.profile, "w", encoding="utf-8") as f:
+                f.write(report + "\n")
@@ -4,6 +4,11 @@ from dataclasses import dataclass, field
 import json
 from typing import Dict, Optional
 
+from .parser import JsonSource, read_json_source
+from .romanize import ROMANIZE_MODES
+
+KARAOKE_GRANULARITIES = ("char", "syllable", "word")
+
 
 @dataclass(frozen=True)
 class StyleConfig:
@@ -40,7 +45,10 @@ class AssConfig:
     play_res_y: int = 1080
     wrap_style: int = 2
     alternate_positions: bool = True
+    lanes: int = 2
     next_show_before_seconds: float = 3.0
+    romanize_mode: str = "syllable"
+    karaoke_granularity: str = "char"
     styles: Dict[str, StyleConfig] = field(default_factory=dict)
 
 
@@ -100,7 +108,18 @@ def load_config(path: Optional[str]) -> AssConfig:
         return default_config()
     with open(path, "r", encoding="utf-8") as f:
         raw = json.load(f)
+    return config_from_dict(raw)
+
+
+def config_from_source(source: "AssConfig | JsonSource | None") -> AssConfig:
+    if source is None:
+        return default_config()
+    if isinstance(source, AssConfig):
+        return source
+    return config_from_dict(read_json_source(source))
+
 
+def config_from_dict(raw: dict) -> AssConfig:
     base = default_config()
     styles = {}
     raw_styles = raw.get("styles", {})
@@ -113,13 +132,25 @@ def load_config(path: Optional[str]) -> AssConfig:
     play_res_y = int(raw.get("play_res_y", base.play_res_y))
     wrap_style = int(raw.get("wrap_style", base.wrap_style))
     alternate_positions = bool(raw.get("alternate_positions", base.alternate_positions))
+    lanes = int(raw.get("lanes", base.lanes))
+    if lanes < 1:
+        raise ValueError(f"Invalid lanes: {lanes}")
     next_show_before_seconds = float(raw.get("next_show_before_seconds", base.next_show_before_seconds))
+    romanize_mode = str(raw.get("romanize_mode", base.romanize_mode))
+    if romanize_mode not in ROMANIZE_MODES:
+        raise ValueError(f"Invalid romanize_mode: {romanize_mode}")
+    karaoke_granularity = str(raw.get("karaoke_granularity", base.karaoke_granularity))
+    if karaoke_granularity not in KARAOKE_GRANULARITIES:
+        raise ValueError(f"Invalid karaoke_granularity: {karaoke_granularity}")
     return AssConfig(
         play_res_x=play_res_x,
         play_res_y=play_res_y,
         wrap_style=wrap_style,
         alternate_positions=alternate_positions,
+        lanes=lanes,
         next_show_before_seconds=next_show_before_seconds,
+        romanize_mode=romanize_mode,
+        karaoke_granularity=karaoke_granularity,
         styles=styles,
     )
 
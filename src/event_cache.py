@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .output import write_atomic
+
+CACHE_VERSION = 1
+
+
+def cache_path_for(output_path: str) -> str:
+    return f"{output_path}.events.json"
+
+
+def _digest(key: tuple) -> str:
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EventCache:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._previous: Dict[str, List[str]] = {}
+        self._current: Dict[str, List[str]] = {}
+        self.romaji_hits = 0
+        self.romaji_misses = 0
+        self._previous_romaji: Dict[str, List[Optional[str]]] = {}
+        self._current_romaji: Dict[str, List[Optional[str]]] = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        if raw.get("version") == CACHE_VERSION:
+            self._previous = raw.get("events", {})
+            self._previous_romaji = raw.get("romaji", {})
+
+    def lookup(self, key: tuple, render: Callable[[], List[str]]) -> List[str]:
+        digest = _digest(key)
+        events = self._current.get(digest) or self._previous.get(digest)
+        if events is None:
+            self.misses += 1
+            events = render()
+        else:
+            self.hits += 1
+        self._current[digest] = events
+        return events
+
+    def romaji(
+        self,
+        key: tuple,
+        compute: Callable[[], Tuple[Optional[str], ...]],
+    ) -> Tuple[Optional[str], ...]:
+        digest = _digest(key)
+        romaji = self._current_romaji.get(digest) or self._previous_romaji.get(digest)
+        if romaji is None:
+            self.romaji_misses += 1
+            result = compute()
+            self._current_romaji[digest] = list(result)
+            return result
+        self.romaji_hits += 1
+        self._current_romaji[digest] = romaji
+        return tuple(romaji)
+
+    def save(self, prune: bool = True) -> None:
+        events = self._current if prune else {**self._previous, **self._current}
+        romaji = self._current_romaji if prune else {**self._previous_romaji, **self._current_romaji}
+        data = json.dumps({"version": CACHE_VERSION, "events": events, "romaji": romaji}, ensure_ascii=False)
+        write_atomic(self.path, data.encode("utf-8"))
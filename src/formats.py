@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, TextIO
+
+from .ass_writer import AssLayout, iter_layout
+from .lrc_writer import write_lrc
+from .ttml_writer import write_ttml
+from .vtt_writer import write_vtt
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    name: str
+    extension: str
+    write: Callable[[AssLayout, TextIO], None]
+
+
+FORMATS: Dict[str, OutputFormat] = {}
+
+
+def register_format(fmt: OutputFormat) -> None:
+    FORMATS[fmt.name] = fmt
+
+
+def get_format(name: str) -> OutputFormat:
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unknown output format: {name} (known: {', '.join(sorted(FORMATS))})") from None
+
+
+def parse_formats(spec: str) -> List[OutputFormat]:
+    names = [name.strip().lower() for name in spec.split(",") if name.strip()]
+    return [get_format(name) for name in dict.fromkeys(names)]
+
+
+def output_path_for_format(output_path: str, fmt: OutputFormat) -> str:
+    return str(Path(output_path).with_suffix(fmt.extension))
+
+
+def _write_ass(layout: AssLayout, stream: TextIO) -> None:
+    stream.writelines(iter_layout(layout))
+
+
+register_format(OutputFormat("ass", ".ass", _write_ass))
+register_format(OutputFormat("lrc", ".lrc", write_lrc))
+register_format(OutputFormat("vtt", ".vtt", write_vtt))
+register_format(OutputFormat("ttml", ".ttml", write_ttml))
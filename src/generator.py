@@ -1,20 +1,296 @@
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Optional
+import io
+import json
+import sys
+from contextlib import nullcontext
+from typing import IO, TYPE_CHECKING, ContextManager, Dict, List, Optional, Sequence, TextIO, Tuple, Union
 
-from .ass_writer import generate_ass
-from .config import load_config
-from .parser import load_lyrics
-from .romanize import auto_romanize
+from .ass_writer import (
+    CompiledConfig,
+    LayoutIndex,
+    PreparedLyrics,
+    compile_config,
+    iter_ass,
+    iter_layout,
+    iter_window,
+    layout_ass,
+    prepare_lyrics,
+    write_ass,
+)
+from .config import AssConfig, config_from_source, load_config
+from .event_cache import EventCache, cache_path_for
+from .lyrics_cache import load_lyrics_cached
+from .model import Lyrics, RomajiOverlay
+from .output import write_if_changed
+from .parser import JsonSource, lyrics_from_source, parse_lyrics
+from .profiling import Profiler
+from .romanize import RomajiLookup, get_romanizer, romanize_overlay, romanizer_version
 
+if TYPE_CHECKING:
+    from .formats import OutputFormat
 
-def generate(input_path: str, output_path: str, config_path: Optional[str]) -> None:
-    lyrics = load_lyrics(input_path)
-    lyrics = auto_romanize(lyrics)
+STDOUT = "-"
 
-    config = load_config(config_path)
-    ass_text = generate_ass(lyrics, config)
+LyricsSource = Union[Lyrics, JsonSource]
+ConfigSource = Union[AssConfig, CompiledConfig, JsonSource, None]
+Window = Tuple[int, int]
 
-    out_path = Path(output_path)
-    out_path.write_text(ass_text, encoding="utf-8")
+
+def _stage(profiler: Optional[Profiler], name: str) -> ContextManager:
+    return profiler.stage(name) if profiler else nullcontext()
+
+
+def render_file(
+    input_path: str,
+    output_path: str,
+    config: AssConfig | CompiledConfig,
+    incremental: bool = False,
+    profiler: Optional[Profiler] = None,
+    lyrics_cache: bool = False,
+    window: Optional[Window] = None,
+) -> bool:
+    lyrics = _load_input(input_path, profiler, lyrics_cache)
+    return render_lyrics(lyrics, output_path, config, incremental, profiler, window)
+
+
+def _load_input(input_path: str, profiler: Optional[Profiler], lyrics_cache: bool) -> Lyrics:
+    if lyrics_cache:
+        with _stage(profiler, "load_lyrics_cached"):
+            return load_lyrics_cached(input_path)
+    with _stage(profiler, "read_json"):
+        with open(input_path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    with _stage(profiler, "parse"):
+        return parse_lyrics(raw)
+
+
+def _romaji_lookup(cache: Optional[EventCache]) -> Optional[RomajiLookup]:
+    if cache is None:
+        return None
+    return lambda key, compute: cache.romaji((romanizer_version(), key), compute)
+
+
+def _romanize(
+    lyrics: Lyrics,
+    config: CompiledConfig,
+    profiler: Optional[Profiler],
+    cache: Optional[EventCache] = None,
+) -> RomajiOverlay:
+    mode = config.config.romanize_mode
+    if profiler is None:
+        return romanize_overlay(lyrics, mode=mode, lookup=_romaji_lookup(cache))
+    romanizer = get_romanizer()
+    before = romanizer.cache_info()
+    with profiler.stage("romanize"):
+        romaji = romanize_overlay(lyrics, romanizer, mode=mode, lookup=_romaji_lookup(cache))
+    after = romanizer.cache_info()
+    lines = lyrics.lead_lines + lyrics.background_lines
+    profiler.count("lead_lines", len(lyrics.lead_lines))
+    profiler.count("background_lines", len(lyrics.background_lines))
+    profiler.count("syllables", sum(len(line.syllables) for line in lines))
+    profiler.count("romanizer_calls", after["misses"] - before["misses"])
+    profiler.count(
+        "romanizer_cache_hits",
+        after["hits"] + after["store_hits"] - before["hits"] - before["store_hits"],
+    )
+    if cache:
+        profiler.count("romaji_cache_hits", cache.romaji_hits)
+        profiler.count("romaji_cache_misses", cache.romaji_misses)
+    return romaji
+
+
+def _write(
+    prepared: PreparedLyrics,
+    config: CompiledConfig,
+    stream: TextIO,
+    cache: Optional[EventCache],
+    profiler: Optional[Profiler],
+    window: Optional[Window] = None,
+) -> None:
+    if profiler is None and window is None:
+        write_ass(prepared, config, stream, cache)
+        return
+    with _stage(profiler, "layout"):
+        layout = layout_ass(prepared, config)
+    if window is None:
+        lines = iter_layout(layout, cache)
+    else:
+        with _stage(profiler, "window_index"):
+            index = LayoutIndex(layout)
+        lines = iter_window(index, window[0], window[1], cache)
+    if profiler is None:
+        stream.writelines(lines)
+        return
+    profiler.write_lines(lines, stream)
+    if cache:
+        profiler.count("event_cache_hits", cache.hits)
+        profiler.count("event_cache_misses", cache.misses)
+
+
+def render_lyrics(
+    lyrics: Lyrics,
+    output_path: str,
+    config: AssConfig | CompiledConfig,
+    incremental: bool = False,
+    profiler: Optional[Profiler] = None,
+    window: Optional[Window] = None,
+) -> bool:
+    config = compile_config(config)
+    cache = _event_cache(output_path, incremental)
+    prepared = prepare_lyrics(lyrics, _romanize(lyrics, config, profiler, cache))
+    return _render_prepared(prepared, output_path, config, cache, profiler, window)
+
+
+def _event_cache(output_path: str, incremental: bool) -> Optional[EventCache]:
+    if not incremental or output_path == STDOUT:
+        return None
+    return EventCache(cache_path_for(output_path))
+
+
+def _render_prepared(
+    prepared: PreparedLyrics,
+    output_path: str,
+    config: CompiledConfig,
+    cache: Optional[EventCache],
+    profiler: Optional[Profiler],
+    window: Optional[Window] = None,
+) -> bool:
+    if output_path == STDOUT:
+        sys.stdout.flush()
+        stream = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8")
+        try:
+            _write(prepared, config, stream, None, profiler, window)
+            stream.flush()
+        finally:
+            stream.detach()
+        return True
+
+    changed = write_if_changed(output_path, lambda f: _write(prepared, config, f, cache, profiler, window))
+    if cache:
+        cache.save(prune=window is None)
+    if profiler:
+        profiler.count("outputs_changed", int(changed))
+    return changed
+
+
+def render_targets(
+    lyrics: Lyrics,
+    targets: Sequence[Tuple[AssConfig | CompiledConfig, str]],
+    incremental: bool = False,
+    profiler: Optional[Profiler] = None,
+) -> List[bool]:
+    prepared_by_mode: Dict[str, PreparedLyrics] = {}
+    changed = []
+    for config, output_path in targets:
+        config = compile_config(config)
+        mode = config.config.romanize_mode
+        prepared = prepared_by_mode.get(mode)
+        if prepared is None:
+            prepared = prepare_lyrics(lyrics, _romanize(lyrics, config, profiler), memoize=len(targets) > 1)
+            prepared_by_mode[mode] = prepared
+        cache = _event_cache(output_path, incremental)
+        changed.append(_render_prepared(prepared, output_path, config, cache, profiler))
+    return changed
+
+
+def render_formats(
+    lyrics: Lyrics,
+    output_path: str,
+    config: AssConfig | CompiledConfig,
+    formats: Sequence[OutputFormat],
+    profiler: Optional[Profiler] = None,
+) -> Dict[str, bool]:
+    from .formats import output_path_for_format
+
+    config = compile_config(config)
+    prepared = prepare_lyrics(lyrics, _romanize(lyrics, config, profiler))
+    with _stage(profiler, "layout"):
+        layout = layout_ass(prepared, config)
+    changed = {}
+    for fmt in formats:
+        path = output_path_for_format(output_path, fmt)
+        with _stage(profiler, f"write_{fmt.name}"):
+            changed[path] = write_if_changed(path, lambda f: fmt.write(layout, f))
+    return changed
+
+
+def generate_formats(
+    input_path: str,
+    output_path: str,
+    config_path: Optional[str],
+    formats: Sequence[OutputFormat],
+    profiler: Optional[Profiler] = None,
+    lyrics_cache: bool = False,
+) -> Dict[str, bool]:
+    with _stage(profiler, "load_config"):
+        config = compile_config(load_config(config_path))
+    lyrics = _load_input(input_path, profiler, lyrics_cache)
+    changed = render_formats(lyrics, output_path, config, formats, profiler)
+    if profiler:
+        profiler.finish()
+    return changed
+
+
+def generate_targets(
+    input_path: str,
+    targets: Sequence[Tuple[Optional[str], str]],
+    incremental: bool = False,
+    profiler: Optional[Profiler] = None,
+    lyrics_cache: bool = False,
+) -> List[bool]:
+    with _stage(profiler, "load_config"):
+        configs = [(compile_config(load_config(config_path)), output_path) for config_path, output_path in targets]
+    lyrics = _load_input(input_path, profiler, lyrics_cache)
+    changed = render_targets(lyrics, configs, incremental, profiler)
+    if profiler:
+        profiler.finish()
+    return changed
+
+
+def generate(
+    input_path: str,
+    output_path: str,
+    config_path: Optional[str],
+    incremental: bool = False,
+    profiler: Optional[Profiler] = None,
+    lyrics_cache: bool = False,
+    window: Optional[Window] = None,
+) -> bool:
+    with _stage(profiler, "load_config"):
+        config = compile_config(load_config(config_path))
+    changed = render_file(input_path, output_path, config, incremental, profiler, lyrics_cache, window)
+    if profiler:
+        profiler.finish()
+    return changed
+
+
+def _compiled(config: ConfigSource) -> CompiledConfig:
+    if isinstance(config, CompiledConfig):
+        return config
+    return compile_config(config_from_source(config))
+
+
+def generate_text(lyrics: LyricsSource, config: ConfigSource = None) -> str:
+    lyrics = lyrics_from_source(lyrics)
+    compiled = _compiled(config)
+    return "".join(iter_ass(prepare_lyrics(lyrics, _romanize(lyrics, compiled, None)), compiled))
+
+
+def generate_bytes(lyrics: LyricsSource, config: ConfigSource = None) -> bytes:
+    return generate_text(lyrics, config).encode("utf-8")
+
+
+def generate_stream(lyrics: LyricsSource, stream: IO, config: ConfigSource = None) -> None:
+    lyrics = lyrics_from_source(lyrics)
+    compiled = _compiled(config)
+    prepared = prepare_lyrics(lyrics, _romanize(lyrics, compiled, None))
+    if not isinstance(stream, (io.RawIOBase, io.BufferedIOBase)):
+        write_ass(prepared, compiled, stream)
+        return
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8")
+    try:
+        write_ass(prepared, compiled, text_stream)
+        text_stream.flush()
+    finally:
+        text_stream.detach()
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import Iterator, TextIO
+
+from .ass_writer import AssLayout, syllable_texts
+
+
+def _format_time(total_cs: int) -> str:
+    minutes, cs = divmod(max(0, total_cs), 6000)
+    return f"{minutes:02d}:{cs // 100:02d}.{cs % 100:02d}"
+
+
+def iter_lrc(layout: AssLayout) -> Iterator[str]:
+    lines = sorted(layout.lead_lines, key=lambda line: line.start_cs)
+    if lines:
+        yield f"[length:{_format_time(max(line.end_cs for line in lines))[:5]}]\n"
+    for line in lines:
+        parts = [f"[{_format_time(line.start_cs)}]"]
+        for s, text in zip(line.syllables, syllable_texts(line, False)):
+            parts.append(f"<{_format_time(s.start_cs)}>{text}")
+        parts.append(f"<{_format_time(line.end_cs)}>")
+        yield "".join(parts) + "\n"
+
+
+def write_lrc(layout: AssLayout, stream: TextIO) -> None:
+    stream.writelines(iter_lrc(layout))
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import os
+import sys
+from typing import List, Optional, Tuple
+
+from .model import Line, Lyrics, Syllable
+from .output import write_atomic
+from .parser import parse_lyrics, read_json_source
+
+CACHE_VERSION = 1
+
+_FORMAT = (CACHE_VERSION, marshal.version, sys.version_info[:2])
+
+
+def lyrics_cache_path(input_path: str) -> str:
+    return f"{input_path}.lyrics.bin"
+
+
+def _pack_lines(lines: List[Line]) -> tuple:
+    return tuple(
+        (
+            line.start_cs,
+            line.end_cs,
+            tuple(s.text for s in line.syllables),
+            tuple(s.start_cs for s in line.syllables),
+            tuple(s.end_cs for s in line.syllables),
+            tuple(s.is_part_of_word for s in line.syllables),
+        )
+        for line in lines
+    )
+
+
+def _unpack_lines(packed: tuple) -> List[Line]:
+    return [
+        Line(
+            syllables=[Syllable(*fields) for fields in zip(texts, starts, ends, words)],
+            start_cs=start_cs,
+            end_cs=end_cs,
+        )
+        for start_cs, end_cs, texts, starts, ends, words in packed
+    ]
+
+
+def _read_entry(path: str) -> Optional[tuple]:
+    try:
+        with open(path, "rb") as f:
+            entry = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(entry, tuple) or len(entry) != 6 or entry[0] != _FORMAT:
+        return None
+    return entry
+
+
+def _write_entry(path: str, entry: tuple) -> None:
+    try:
+        write_atomic(path, marshal.dumps(entry))
+    except OSError:
+        pass
+
+
+def _from_entry(entry: tuple) -> Lyrics:
+    return Lyrics(lead_lines=_unpack_lines(entry[4]), background_lines=_unpack_lines(entry[5]))
+
+
+def load_lyrics_cached(input_path: str, cache_path: Optional[str] = None) -> Lyrics:
+    cache_path = cache_path or lyrics_cache_path(input_path)
+    stat = os.stat(input_path)
+    entry = _read_entry(cache_path)
+    if entry and entry[1] == stat.st_size and entry[2] == stat.st_mtime_ns:
+        return _from_entry(entry)
+
+    with open(input_path, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).digest()
+    if entry and entry[1] == len(data) and entry[3] == digest:
+        _write_entry(cache_path, (_FORMAT, len(data), stat.st_mtime_ns, digest, entry[4], entry[5]))
+        return _from_entry(entry)
+
+    lyrics = parse_lyrics(read_json_source(data))
+    packed: Tuple[tuple, tuple] = (_pack_lines(lyrics.lead_lines), _pack_lines(lyrics.background_lines))
+    _write_entry(cache_path, (_FORMAT, len(data), stat.st_mtime_ns, digest) + packed)
+    return lyrics
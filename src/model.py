@@ -1,28 +1,56 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Syllable:
     text: str
-    start: float
-    end: float
+    start_cs: int
+    end_cs: int
     is_part_of_word: bool
     romanized: Optional[str] = None
 
+    @property
+    def start(self) -> float:
+        return self.start_cs / 100
+
+    @property
+    def end(self) -> float:
+        return self.end_cs / 100
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Line:
     syllables: List[Syllable]
-    start: float
-    end: float
+    start_cs: int
+    end_cs: int
+
+    @property
+    def start(self) -> float:
+        return self.start_cs / 100
+
+    @property
+    def end(self) -> float:
+        return self.end_cs / 100
 
     @property
     def text(self) -> str:
         return "".join(s.text for s in self.syllables)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Lyrics:
     lead_lines: List[Line]
     background_lines: List[Line]
+
+
+@dataclass(frozen=True, slots=True)
+class RomajiOverlay:
+    lead: Dict[int, Tuple[Optional[str], ...]]
+    background: Dict[int, Tuple[Optional[str], ...]]
+
+    def __bool__(self) -> bool:
+        return bool(self.lead or self.background)
+
+
+NO_ROMAJI = RomajiOverlay(lead={}, background={})
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import stat
+from typing import BinaryIO, Callable, TextIO, Tuple
+
+_CHUNK_SIZE = 1 << 16
+
+
+class _HashingWriter(io.RawIOBase):
+    def __init__(self, raw: io.BufferedWriter) -> None:
+        self._raw = raw
+        self.hash = hashlib.blake2b(digest_size=32)
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.hash.update(data)
+        self.size += len(data)
+        return self._raw.write(data)
+
+
+def file_digest(path: str) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _unchanged(path: str, size: int, digest: bytes) -> bool:
+    try:
+        if os.stat(path).st_size != size:
+            return False
+        return file_digest(path) == digest
+    except OSError:
+        return False
+
+
+def _create_exclusive(directory: str, name: str) -> Tuple[int, str]:
+    while True:
+        tmp_path = os.path.join(directory, f"{name}.{os.urandom(6).hex()}.tmp")
+        try:
+            return os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+def open_temp(path: str) -> Tuple[BinaryIO, str]:
+    directory, name = os.path.split(path)
+    fd, tmp_path = _create_exclusive(directory or ".", name)
+    try:
+        os.fchmod(fd, stat.S_IMODE(os.stat(path).st_mode))
+    except FileNotFoundError:
+        pass
+    except BaseException:
+        os.close(fd)
+        _discard(tmp_path)
+        raise
+    return os.fdopen(fd, "wb"), tmp_path
+
+
+def _discard(tmp_path: str) -> None:
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _sync(f: BinaryIO) -> None:
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    f, tmp_path = open_temp(path)
+    try:
+        with f:
+            f.write(data)
+            _sync(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+
+
+def write_if_changed(path: str, render: Callable[[TextIO], None]) -> bool:
+    raw, tmp_path = open_temp(path)
+    try:
+        with raw:
+            hashing = _HashingWriter(raw)
+            stream = io.TextIOWrapper(io.BufferedWriter(hashing), encoding="utf-8")
+            render(stream)
+            stream.flush()
+            stream.detach().detach()
+            if _unchanged(path, hashing.size, hashing.hash.digest()):
+                changed = False
+            else:
+                _sync(raw)
+                changed = True
+        if changed:
+            os.replace(tmp_path, path)
+        else:
+            _discard(tmp_path)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+    return changed
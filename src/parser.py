@@ -1,5 +1,7 @@
 import json
-from typing import List, Optional
+import os
+import sys
+from typing import IO, List, Optional, Union
 
 from .model import Line, Lyrics, Syllable
 
@@ -9,33 +11,77 @@ def _extract_content(data: dict) -> list:
     return [c for c in content if c.get("Type") == "Vocal" and c.get("Lead")]
 
 
+def _to_cs(seconds) -> int:
+    return int(round(float(seconds) * 100))
+
+
 def _build_line(source: dict) -> Optional[Line]:
     syllables = []
     for s in source.get("Syllables", []):
         syllables.append(
             Syllable(
-                text=str(s.get("Text", "")),
-                start=float(s.get("StartTime", 0.0)),
-                end=float(s.get("EndTime", 0.0)),
+                text=sys.intern(str(s.get("Text", ""))),
+                start_cs=_to_cs(s.get("StartTime", 0.0)),
+                end_cs=_to_cs(s.get("EndTime", 0.0)),
                 is_part_of_word=bool(s.get("IsPartOfWord", False)),
             )
         )
     if not syllables:
         return None
-    start = float(source.get("StartTime", syllables[0].start))
-    end = float(source.get("EndTime", syllables[-1].end))
-    return Line(syllables=syllables, start=start, end=end)
+    start_cs = _to_cs(source["StartTime"]) if "StartTime" in source else syllables[0].start_cs
+    end_cs = _to_cs(source["EndTime"]) if "EndTime" in source else syllables[-1].end_cs
+    return Line(syllables=syllables, start_cs=start_cs, end_cs=end_cs)
+
+
+JsonSource = Union[dict, bytes, bytearray, memoryview, str, "os.PathLike[str]", IO]
+
+
+def read_json_source(source: JsonSource) -> dict:
+    if isinstance(source, dict):
+        return source
+    if isinstance(source, os.PathLike):
+        with open(source, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if isinstance(source, memoryview):
+        source = source.tobytes()
+    if isinstance(source, (bytes, bytearray, str)):
+        return json.loads(source)
+    if hasattr(source, "read"):
+        return json.loads(source.read())
+    raise TypeError(f"Unsupported JSON source: {type(source).__name__}")
+
+
+def lyrics_from_source(source: Union[Lyrics, JsonSource]) -> Lyrics:
+    if isinstance(source, Lyrics):
+        return source
+    return parse_lyrics(read_json_source(source))
 
 
 def load_lyrics(path: str) -> Lyrics:
     with open(path, "r", encoding="utf-8") as f:
         raw = json.load(f)
+    return parse_lyrics(raw)
+
 
+def select_query(raw: dict, operation_id: Optional[str] = None, operation: Optional[str] = None) -> dict:
     queries = raw.get("queries") or []
     if not queries:
         raise ValueError("No queries in lyric.json")
+    for query in queries:
+        if operation_id is not None and str(query.get("operationId")) != str(operation_id):
+            continue
+        if operation is not None and query.get("operation") != operation:
+            continue
+        return query
+    raise ValueError(f"No query with operationId={operation_id!r} operation={operation!r}")
+
+
+def parse_lyrics(raw: dict, operation_id: Optional[str] = None, operation: Optional[str] = None) -> Lyrics:
+    return parse_query(select_query(raw, operation_id, operation))
+
 
-    data = queries[0].get("result", {}).get("data", {})
+def parse_query(query: dict) -> Lyrics:
+    data = query.get("result", {}).get("data", {})
     content = _extract_content(data)
     lead_lines: List[Line] = []
     background_lines: List[Line] = []
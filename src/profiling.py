@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+
+class Profiler:
+    def __init__(self, hook: Optional[Callable[[dict], None]] = None) -> None:
+        self.hook = hook
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def write_lines(self, lines: Iterable[str], stream: TextIO) -> None:
+        render = 0.0
+        write = 0.0
+        events = 0
+        size = 0
+        clock = time.perf_counter
+        iterator = iter(lines)
+        while True:
+            started = clock()
+            line = next(iterator, None)
+            produced = clock()
+            render += produced - started
+            if line is None:
+                break
+            stream.write(line)
+            write += clock() - produced
+            if line.startswith("Dialogue:"):
+                events += 1
+            size += len(line.encode("utf-8"))
+        self.add_time("render_events", render)
+        self.add_time("write", write)
+        self.count("events", events)
+        self.count("output_bytes", size)
+
+    def report(self) -> dict:
+        return {
+            "stages": {name: round(seconds, 6) for name, seconds in self.stages.items()},
+            "total_seconds": round(sum(self.stages.values()), 6),
+            "counters": dict(self.counters),
+        }
+
+    def finish(self) -> dict:
+        report = self.report()
+        if self.hook:
+            self.hook(report)
+        return report
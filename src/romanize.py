@@ -1,13 +1,34 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import json
+import threading
+import unicodedata
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
 
-from .model import Line, Lyrics, Syllable
+from .model import NO_ROMAJI, Line, Lyrics, RomajiOverlay, Syllable
 
-try:
-    from pykakasi import kakasi
-except ImportError:  # pragma: no cover
-    kakasi = None
+if TYPE_CHECKING:
+    from .romanize_cache import RomanizeCache
+
+_kakasi_factory = None
+_kakasi_loaded = False
+
+ROMANIZE_MODES = ("syllable", "line")
+
+Segments = Tuple[Tuple[str, str, str], ...]
+LineRomaji = Tuple[Optional[str], ...]
+RomajiLookup = Callable[[Hashable, Callable[[], LineRomaji]], LineRomaji]
+
+_VOICING_MARKS = "\u3099\u309a"
+_UNVOICED = {
+    code: decomposed[0]
+    for code in range(0x3041, 0x3097)
+    for decomposed in [unicodedata.normalize("NFD", chr(code))]
+    if len(decomposed) == 2 and decomposed[1] in _VOICING_MARKS
+}
 
 
 def _has_japanese(text: str) -> bool:
@@ -26,40 +47,372 @@ def _has_japanese(text: str) -> bool:
     return False
 
 
-def _romanize_text(text: str) -> Optional[str]:
-    if kakasi is None:
+def _has_kanji(text: str) -> bool:
+    return any(0x4E00 <= ord(ch) <= 0x9FFF or ch == "\u3005" for ch in text)
+
+
+def _to_hiragana(text: str) -> str:
+    return "".join(chr(ord(ch) - 0x60) if 0x30A1 <= ord(ch) <= 0x30F6 else ch for ch in text)
+
+
+def _load_kakasi():
+    global _kakasi_factory, _kakasi_loaded
+    if not _kakasi_loaded:
+        _kakasi_loaded = True
+        try:
+            from pykakasi import kakasi
+        except ImportError:  # pragma: no cover
+            kakasi = None
+        _kakasi_factory = kakasi
+    return _kakasi_factory
+
+
+@lru_cache(maxsize=None)
+def romanizer_version() -> str:
+    from importlib import metadata
+
+    try:
+        return f"pykakasi-{metadata.version('pykakasi')}"
+    except metadata.PackageNotFoundError:
+        return "pykakasi-unknown"
+
+
+class Romanizer:
+    def __init__(self, maxsize: int = 4096, store: Optional[RomanizeCache] = None) -> None:
+        self.maxsize = maxsize
+        self.store = store
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._kakasi = None
+        self._converter = None
+        self._memo: OrderedDict[Hashable, object] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return _load_kakasi() is not None
+
+    def _get_converter(self):
+        if self._converter is None:
+            kks = _load_kakasi()()
+            kks.setMode("H", "a")
+            kks.setMode("K", "a")
+            kks.setMode("J", "a")
+            self._kakasi = kks
+            self._converter = kks.getConverter()
+        return self._converter
+
+    def _cached(
+        self,
+        mode: str,
+        text: str,
+        compute: Callable[[], object],
+        encode: Callable[[object], str] = str,
+        decode: Callable[[str], object] = str,
+    ):
+        with self._lock:
+            key: Hashable = (mode, text)
+            cached = self._memo.get(key)
+            if cached is not None:
+                self.hits += 1
+                self._memo.move_to_end(key)
+                return cached
+            stored = self.store.get(mode, text) if self.store else None
+            if stored is not None:
+                self.store_hits += 1
+                result = decode(stored)
+            else:
+                if not self.available:
+                    return None
+                self.misses += 1
+                result = compute()
+                if self.store:
+                    self.store.put(mode, text, encode(result))
+            self._memo[key] = result
+            if len(self._memo) > self.maxsize:
+                self._memo.popitem(last=False)
+            return result
+
+    def _convert(self, text: str) -> str:
+        return self._get_converter().do(text)
+
+    def _segment(self, text: str) -> Segments:
+        self._get_converter()
+        return tuple((item["orig"], item["hira"], item["hepburn"]) for item in self._kakasi.convert(text))
+
+    def romanize(self, text: str) -> Optional[str]:
+        return self._cached("syllable", text, lambda: self._convert(text))
+
+    def segments(self, text: str) -> Optional[Segments]:
+        return self._cached(
+            "segments",
+            text,
+            lambda: self._segment(text),
+            encode=lambda value: json.dumps(value, ensure_ascii=False),
+            decode=lambda raw: tuple(tuple(item) for item in json.loads(raw)),
+        )
+
+    def reading(self, text: str) -> Optional[str]:
+        segments = self.segments(text)
+        if segments is None:
+            return None
+        return "".join(hira for _, hira, _ in segments)
+
+    def flush(self) -> None:
+        if self.store:
+            self.store.flush()
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "size": len(self._memo),
+            "maxsize": self.maxsize,
+        }
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+            self.hits = 0
+            self.store_hits = 0
+            self.misses = 0
+
+
+_romanizer: Optional[Romanizer] = None
+
+
+def get_romanizer() -> Romanizer:
+    global _romanizer
+    if _romanizer is None:
+        _romanizer = Romanizer()
+    return _romanizer
+
+
+def use_cache(path: str, max_entries: int = 200_000) -> Romanizer:
+    from .romanize_cache import RomanizeCache
+
+    romanizer = get_romanizer()
+    if romanizer.store:
+        romanizer.store.close()
+    romanizer.store = RomanizeCache(path, romanizer_version(), max_entries)
+    return romanizer
+
+
+def _split_reading(shares: Sequence[str], reading: str, romanizer: Romanizer) -> Optional[List[str]]:
+    if len(shares) == 1:
+        return [reading] if reading else None
+    if len(reading) < len(shares):
         return None
-    kks = kakasi()
-    kks.setMode("H", "a")
-    kks.setMode("K", "a")
-    kks.setMode("J", "a")
-    converter = kks.getConverter()
-    return converter.do(text)
+    folded = reading.translate(_UNVOICED)
+    head = romanizer.reading(shares[0])
+    for prefix in (head, head[:-1] + "っ") if head else ():
+        if len(prefix) < len(reading) and folded.startswith(prefix.translate(_UNVOICED)):
+            rest = _split_reading(shares[1:], reading[len(prefix) :], romanizer)
+            if rest is not None:
+                return [reading[: len(prefix)]] + rest
+    tail = romanizer.reading(shares[-1])
+    if tail and len(tail) < len(reading) and folded.endswith(tail.translate(_UNVOICED)):
+        rest = _split_reading(shares[:-1], reading[: -len(tail)], romanizer)
+        if rest is not None:
+            return rest + [reading[-len(tail) :]]
+    return None
+
+
+def _share_readings(shares: List[str], hira: str, romanizer: Romanizer) -> Optional[List[str]]:
+    readings: List[str] = []
+    pos = 0
+    idx = 0
+    while idx < len(shares):
+        if not _has_kanji(shares[idx]):
+            kana = _to_hiragana(shares[idx])
+            if not hira.startswith(kana, pos):
+                return None
+            readings.append(kana)
+            pos += len(kana)
+            idx += 1
+            continue
+        end = idx
+        while end < len(shares) and _has_kanji(shares[end]):
+            end += 1
+        if end < len(shares):
+            stop = hira.find(_to_hiragana(shares[end]), pos + end - idx)
+            if stop < 0:
+                return None
+        else:
+            stop = len(hira)
+        split = _split_reading(shares[idx:end], hira[pos:stop], romanizer)
+        if split is None:
+            return None
+        readings.extend(split)
+        pos = stop
+        idx = end
+    return readings if pos == len(hira) else None
+
+
+def _romanize_readings(readings: List[str], romanizer: Romanizer) -> Optional[List[str]]:
+    result: List[str] = []
+    for idx, reading in enumerate(readings):
+        geminate = reading.endswith("っ") and idx + 1 < len(readings)
+        text = reading[:-1] if geminate else reading
+        roman = romanizer.romanize(text) if text else ""
+        if roman is None:
+            return None
+        if text.startswith("ー") and result and result[-1]:
+            roman = result[-1][-1] + roman[1:]
+        result.append(roman)
+    for idx, reading in enumerate(readings[:-1]):
+        if reading.endswith("っ"):
+            following = result[idx + 1]
+            result[idx] += "t" if following.startswith("ch") else following[:1]
+    return result
+
+
+def _align_segments(
+    syllables: Sequence[Syllable],
+    segments: Segments,
+    romanizer: Romanizer,
+) -> List[Optional[str]]:
+    starts: List[int] = []
+    pos = 0
+    for s in syllables:
+        starts.append(pos)
+        pos += len(s.text)
+    if sum(len(orig) for orig, _, _ in segments) != pos:
+        return [None] * len(syllables)
 
+    parts: List[Optional[List[str]]] = [[] for _ in syllables]
+    pos = 0
+    for orig, hira, roman in segments:
+        if not orig:
+            continue
+        first = bisect_right(starts, pos) - 1
+        last = bisect_right(starts, pos + len(orig) - 1) - 1
+        if first == last:
+            if parts[first] is not None:
+                parts[first].append(roman)
+            pos += len(orig)
+            continue
+        shares = [
+            orig[max(starts[idx], pos) - pos : min(starts[idx] + len(syllables[idx].text), pos + len(orig)) - pos]
+            for idx in range(first, last + 1)
+        ]
+        pos += len(orig)
+        readings = _share_readings(shares, hira, romanizer)
+        romaji = _romanize_readings(readings, romanizer) if readings is not None else None
+        for idx, share_roman in zip(range(first, last + 1), romaji or [None] * len(shares)):
+            if share_roman is None or parts[idx] is None:
+                parts[idx] = None
+            else:
+                parts[idx].append(share_roman)
+    return [None if p is None else "".join(p) for p in parts]
 
-def _romanize_lines(lines: List[Line]) -> List[Line]:
+
+def _romanize_line(line: Line, romanizer: Romanizer) -> List[Optional[str]]:
+    pending = [s.romanized is None and _has_japanese(s.text) for s in line.syllables]
+    if not any(pending):
+        return [s.romanized for s in line.syllables]
+    segments = romanizer.segments(line.text)
+    aligned = _align_segments(line.syllables, segments, romanizer) if segments else [None] * len(pending)
+    result: List[Optional[str]] = []
+    for s, needs, roman in zip(line.syllables, pending, aligned):
+        if not needs:
+            result.append(s.romanized)
+        elif roman is not None:
+            result.append(roman)
+        else:
+            result.append(romanizer.romanize(s.text))
+    return result
+
+
+def _romanize_syllables(line: Line, romanizer: Romanizer) -> List[Optional[str]]:
+    result: List[Optional[str]] = []
+    for s in line.syllables:
+        romanized = s.romanized
+        if romanized is None and _has_japanese(s.text):
+            romanized = romanizer.romanize(s.text)
+        result.append(romanized)
+    return result
+
+
+def _romaji_key(line: Line, mode: str) -> Hashable:
+    return (mode, tuple((s.text, s.romanized) for s in line.syllables))
+
+
+def _overlay_lines(
+    lines: List[Line],
+    romanizer: Romanizer,
+    mode: str,
+    lookup: Optional[RomajiLookup] = None,
+) -> Optional[Dict[int, LineRomaji]]:
+    romanize_line = _romanize_line if mode == "line" else _romanize_syllables
+    overlay: Optional[Dict[int, LineRomaji]] = None
+    for idx, line in enumerate(lines):
+        if not any(s.romanized is None and _has_japanese(s.text) for s in line.syllables):
+            continue
+        if lookup is None:
+            romaji = tuple(romanize_line(line, romanizer))
+        else:
+            romaji = lookup(_romaji_key(line, mode), lambda: tuple(romanize_line(line, romanizer)))
+        if overlay is None:
+            overlay = {}
+        overlay[idx] = romaji
+    return overlay
+
+
+def romanize_overlay(
+    lyrics: Lyrics,
+    romanizer: Optional[Romanizer] = None,
+    mode: str = "syllable",
+    lookup: Optional[RomajiLookup] = None,
+) -> RomajiOverlay:
+    if mode not in ROMANIZE_MODES:
+        raise ValueError(f"Invalid romanize mode: {mode}")
+    romanizer = romanizer or get_romanizer()
+    lead = _overlay_lines(lyrics.lead_lines, romanizer, mode, lookup)
+    background = _overlay_lines(lyrics.background_lines, romanizer, mode, lookup)
+    romanizer.flush()
+    if lead is None and background is None:
+        return NO_ROMAJI
+    return RomajiOverlay(lead=lead or {}, background=background or {})
+
+
+def _apply_lines(lines: List[Line], overlay: Dict[int, Tuple[Optional[str], ...]]) -> List[Line]:
+    if not overlay:
+        return lines
     updated: List[Line] = []
-    for line in lines:
-        syllables: List[Syllable] = []
-        for s in line.syllables:
-            romanized = s.romanized
-            if romanized is None and _has_japanese(s.text):
-                romanized = _romanize_text(s.text)
-            syllables.append(
-                Syllable(
-                    text=s.text,
-                    start=s.start,
-                    end=s.end,
-                    is_part_of_word=s.is_part_of_word,
-                    romanized=romanized,
-                )
+    for idx, line in enumerate(lines):
+        romaji = overlay.get(idx)
+        if romaji is None:
+            updated.append(line)
+            continue
+        syllables = [
+            Syllable(
+                text=s.text,
+                start_cs=s.start_cs,
+                end_cs=s.end_cs,
+                is_part_of_word=s.is_part_of_word,
+                romanized=romanized,
             )
-        updated.append(Line(syllables=syllables, start=line.start, end=line.end))
+            for s, romanized in zip(line.syllables, romaji)
+        ]
+        updated.append(Line(syllables=syllables, start_cs=line.start_cs, end_cs=line.end_cs))
     return updated
 
 
-def auto_romanize(lyrics: Lyrics) -> Lyrics:
+def apply_overlay(lyrics: Lyrics, overlay: RomajiOverlay) -> Lyrics:
+    if not overlay:
+        return lyrics
     return Lyrics(
-        lead_lines=_romanize_lines(lyrics.lead_lines),
-        background_lines=_romanize_lines(lyrics.background_lines),
+        lead_lines=_apply_lines(lyrics.lead_lines, overlay.lead),
+        background_lines=_apply_lines(lyrics.background_lines, overlay.background),
     )
+
+
+def auto_romanize(
+    lyrics: Lyrics,
+    romanizer: Optional[Romanizer] = None,
+    mode: str = "syllable",
+) -> Lyrics:
+    return apply_overlay(lyrics, romanize_overlay(lyrics, romanizer, mode))
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS romanized (
+    mode TEXT NOT NULL,
+    version TEXT NOT NULL,
+    text TEXT NOT NULL,
+    value TEXT NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (mode, version, text)
+)
+"""
+
+
+class RomanizeCache:
+    def __init__(self, path: str, version: str, max_entries: int = 200_000) -> None:
+        self.path = path
+        self.version = version
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._touched: List[Tuple[str, str]] = []
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(_SCHEMA)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS romanized_used ON romanized (used)")
+
+    def get(self, mode: str, text: str) -> Optional[str]:
+        with self._lock:
+            pending = self._pending.get((mode, text))
+            if pending is not None:
+                return pending
+            row = self._conn.execute(
+                "SELECT value FROM romanized WHERE mode = ? AND version = ? AND text = ?",
+                (mode, self.version, text),
+            ).fetchone()
+            if row is None:
+                return None
+            self._touched.append((mode, text))
+            return row[0]
+
+    def put(self, mode: str, text: str, value: str) -> None:
+        with self._lock:
+            self._pending[(mode, text)] = value
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._pending and not self._touched:
+                return
+            now = time.time()
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO romanized (mode, version, text, value, used) VALUES (?, ?, ?, ?, ?)",
+                    [(mode, self.version, text, value, now) for (mode, text), value in self._pending.items()],
+                )
+                self._conn.executemany(
+                    "UPDATE romanized SET used = ? WHERE mode = ? AND version = ? AND text = ?",
+                    [(now, mode, self.version, text) for mode, text in self._touched],
+                )
+                if self._pending:
+                    self._evict()
+            self._pending.clear()
+            self._touched.clear()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM romanized").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM romanized WHERE rowid IN (SELECT rowid FROM romanized ORDER BY used LIMIT ?)",
+                (excess,),
+            )
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import socketserver
+import sys
+import time
+from typing import Dict, Optional, TextIO
+
+from .ass_writer import CompiledConfig, compile_config
+from .config import config_from_dict, default_config, load_config
+from .generator import STDOUT, render_lyrics
+from .lyrics_cache import load_lyrics_cached
+from .parser import load_lyrics, parse_lyrics
+from .romanize import get_romanizer
+
+
+class RenderServer:
+    def __init__(
+        self,
+        config_path: Optional[str] = None,
+        incremental: bool = False,
+        lyrics_cache: bool = False,
+    ) -> None:
+        self.config_path = config_path
+        self.incremental = incremental
+        self.lyrics_cache = lyrics_cache
+        self.jobs = 0
+        self._configs: Dict[tuple, CompiledConfig] = {}
+
+    def _config(self, job: dict) -> CompiledConfig:
+        inline = job.get("config")
+        path = job.get("config_path") or self.config_path
+        if isinstance(inline, dict):
+            key: tuple = ("inline", json.dumps(inline, sort_keys=True))
+        elif path:
+            stat = os.stat(path)
+            key = ("path", os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        else:
+            key = ("default",)
+        config = self._configs.get(key)
+        if config is None:
+            if key[0] == "inline":
+                config = compile_config(config_from_dict(inline))
+            elif key[0] == "path":
+                config = compile_config(load_config(path))
+            else:
+                config = compile_config(default_config())
+            self._configs[key] = config
+        return config
+
+    def handle(self, job: dict) -> dict:
+        started = time.perf_counter()
+        reply: dict = {"id": job.get("id")}
+        if job.get("command") == "stats":
+            reply.update(status="ok", stats=self.stats())
+            return reply
+        try:
+            output = job.get("output")
+            if not output or output == STDOUT:
+                raise ValueError("Job needs an output path")
+            if isinstance(job.get("lyrics"), dict):
+                lyrics = parse_lyrics(job["lyrics"])
+            elif job.get("input") and self.lyrics_cache:
+                lyrics = load_lyrics_cached(job["input"])
+            elif job.get("input"):
+                lyrics = load_lyrics(job["input"])
+            else:
+                raise ValueError("Job needs an input path or inline lyrics")
+            changed = render_lyrics(lyrics, output, self._config(job), self.incremental)
+            reply.update(status="ok", output=output, changed=changed)
+        except Exception as exc:
+            reply.update(status="error", error=f"{type(exc).__name__}: {exc}")
+        self.jobs += 1
+        reply["seconds"] = round(time.perf_counter() - started, 6)
+        return reply
+
+    def serve_stream(self, reader: TextIO, writer: TextIO) -> None:
+        for raw in reader:
+            if not raw.strip():
+                continue
+            try:
+                job = json.loads(raw)
+                if not isinstance(job, dict):
+                    raise ValueError("Job must be a JSON object")
+            except ValueError as exc:
+                reply: dict = {"id": None, "status": "error", "error": f"Invalid job: {exc}"}
+            else:
+                reply = self.handle(job)
+            writer.write(json.dumps(reply, ensure_ascii=False) + "\n")
+            writer.flush()
+
+    def stats(self) -> dict:
+        return {"jobs": self.jobs, "configs": len(self._configs), "romanizer": get_romanizer().cache_info()}
+
+
+def serve_socket(server: RenderServer, path: str) -> None:
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            reader = io.TextIOWrapper(self.rfile, encoding="utf-8")
+            writer = io.TextIOWrapper(self.wfile, encoding="utf-8")
+            server.serve_stream(reader, writer)
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.UnixStreamServer(path, Handler) as listener:
+        try:
+            listener.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def serve(
+    socket_path: Optional[str] = None,
+    config_path: Optional[str] = None,
+    incremental: bool = False,
+    lyrics_cache: bool = False,
+) -> None:
+    server = RenderServer(config_path, incremental, lyrics_cache)
+    if socket_path:
+        serve_socket(server, socket_path)
+    else:
+        server.serve_stream(sys.stdin, sys.stdout)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import heapq
+import math
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+from .ass_writer import AssLayout, layout_ass
+from .config import AssConfig
+from .model import Line, Lyrics, RomajiOverlay
+
+LEAD = "lead"
+BACKGROUND = "background"
+
+
+@dataclass(frozen=True, slots=True)
+class ActiveLine:
+    kind: str
+    index: int
+    line: Line
+    lane: Optional[int]
+    style: str
+    display_start_cs: int
+    end_cs: int
+    x: int
+    y: int
+    syllable: Optional[int]
+    progress: float
+
+
+def _to_cs(t: float) -> int:
+    return math.floor(t * 100)
+
+
+class Timeline:
+    def __init__(self, layout: AssLayout) -> None:
+        self.layout = layout
+        spans: List[Tuple[int, int, str, int]] = [
+            (m.display_start_cs, m.display_end_cs, LEAD, idx) for idx, m in enumerate(layout.lead_meta)
+        ]
+        spans.extend((start, end, BACKGROUND, idx) for idx, (_, start, end, _, _) in enumerate(layout.background))
+        order = sorted(range(len(spans)), key=lambda i: spans[i][0])
+        self._spans = [spans[i] for i in order]
+        self._order = order
+        self.starts = [span[0] for span in self._spans]
+        self.ends = [span[1] for span in self._spans]
+        self._max_ends = list(accumulate(self.ends, max))
+        self._syllable_starts = [[s.start_cs for s in self._line(span).syllables] for span in self._spans]
+
+    @classmethod
+    def build(
+        cls,
+        lyrics: Lyrics,
+        config: AssConfig,
+        romaji: Optional[RomajiOverlay] = None,
+    ) -> "Timeline":
+        return cls(layout_ass(lyrics, config, romaji))
+
+    def _line(self, span: Tuple[int, int, str, int]) -> Line:
+        if span[2] == LEAD:
+            return self.layout.lead_lines[span[3]]
+        return self.layout.background[span[3]][0]
+
+    def describe(self, positions: List[int], t: float) -> List[ActiveLine]:
+        t_cs = _to_cs(t)
+        active = []
+        for pos in sorted(positions, key=lambda p: self._order[p]):
+            start, end, kind, idx = self._spans[pos]
+            if kind == LEAD:
+                line = self.layout.lead_lines[idx]
+                meta = self.layout.lead_meta[idx]
+                lane: Optional[int] = meta.lane
+                style = meta.current_style.style.name
+                x, y = self.layout.lead_positions[idx]
+            else:
+                line, _, _, x, y = self.layout.background[idx]
+                lane = None
+                style = self.layout.compiled.background.style.name
+            syllable = bisect_right(self._syllable_starts[pos], t_cs) - 1
+            if syllable < 0 or t_cs >= line.syllables[syllable].end_cs:
+                syllable = None
+            duration = line.end_cs - line.start_cs
+            if duration > 0:
+                progress = min(1.0, max(0.0, (t * 100 - line.start_cs) / duration))
+            else:
+                progress = 1.0 if t_cs >= line.end_cs else 0.0
+            active.append(ActiveLine(kind, idx, line, lane, style, start, end, x, y, syllable, progress))
+        return active
+
+    def positions_at(self, t_cs: int) -> List[int]:
+        hi = bisect_right(self.starts, t_cs)
+        lo = bisect_right(self._max_ends, t_cs, 0, hi)
+        return [pos for pos in range(lo, hi) if self.ends[pos] > t_cs]
+
+    def at(self, t: float) -> List[ActiveLine]:
+        return self.describe(self.positions_at(_to_cs(t)), t)
+
+    def cursor(self) -> "TimelineCursor":
+        return TimelineCursor(self)
+
+
+class TimelineCursor:
+    def __init__(self, timeline: Timeline) -> None:
+        self.timeline = timeline
+        self._t_cs = -1
+        self._next = 0
+        self._active: List[Tuple[int, int]] = []
+
+    def seek(self, t: float) -> None:
+        t_cs = _to_cs(t)
+        timeline = self.timeline
+        self._t_cs = t_cs
+        self._next = bisect_right(timeline.starts, t_cs)
+        self._active = [(timeline.ends[pos], pos) for pos in timeline.positions_at(t_cs)]
+        heapq.heapify(self._active)
+
+    def advance(self, t: float) -> List[ActiveLine]:
+        t_cs = _to_cs(t)
+        if t_cs < self._t_cs:
+            self.seek(t)
+        timeline = self.timeline
+        starts = timeline.starts
+        ends = timeline.ends
+        while self._next < len(starts) and starts[self._next] <= t_cs:
+            if ends[self._next] > t_cs:
+                heapq.heappush(self._active, (ends[self._next], self._next))
+            self._next += 1
+        while self._active and self._active[0][0] <= t_cs:
+            heapq.heappop(self._active)
+        self._t_cs = t_cs
+        return timeline.describe([pos for _, pos in self._active], t)
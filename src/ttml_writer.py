@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Iterator, List, TextIO, Tuple
+from html import escape
+
+from .ass_writer import AssLayout, syllable_texts
+from .model import Line
+
+
+def _format_time(total_cs: int) -> str:
+    total_cs = max(0, total_cs)
+    hours, rest = divmod(total_cs, 360000)
+    minutes, rest = divmod(rest, 6000)
+    return f"{hours:02d}:{minutes:02d}:{rest // 100:02d}.{rest % 100:02d}0"
+
+
+def _paragraph(line: Line, role: str) -> str:
+    role_attr = f' ttm:role="{escape(role)}"' if role else ""
+    spans = "".join(
+        f'<span begin="{_format_time(s.start_cs)}" end="{_format_time(s.end_cs)}">{escape(text, quote=False)}</span>'
+        for s, text in zip(line.syllables, syllable_texts(line, False))
+    )
+    begin = _format_time(line.start_cs)
+    end = _format_time(line.end_cs)
+    return f'      <p begin="{begin}" end="{end}"{role_attr} xml:space="preserve">{spans}</p>\n'
+
+
+def iter_ttml(layout: AssLayout) -> Iterator[str]:
+    lines: List[Tuple[int, int, Line, str]] = [
+        (line.start_cs, idx, line, "") for idx, line in enumerate(layout.lead_lines)
+    ]
+    offset = len(lines)
+    lines.extend((bg[0].start_cs, offset + idx, bg[0], "x-bg") for idx, bg in enumerate(layout.background))
+    end_cs = max((line.end_cs for _, _, line, _ in lines), default=0)
+
+    yield '<?xml version="1.0" encoding="utf-8"?>\n'
+    yield '<tt xmlns="http://www.w3.org/ns/ttml" xmlns:ttm="http://www.w3.org/ns/ttml#metadata">\n'
+    yield f'  <body dur="{_format_time(end_cs)}">\n'
+    yield "    <div>\n"
+    for _, _, line, role in sorted(lines, key=lambda item: item[:2]):
+        yield _paragraph(line, role)
+    yield "    </div>\n"
+    yield "  </body>\n"
+    yield "</tt>\n"
+
+
+def write_ttml(layout: AssLayout, stream: TextIO) -> None:
+    stream.writelines(iter_ttml(layout))
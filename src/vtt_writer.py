@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, TextIO, Tuple
+
+from .ass_writer import AssLayout, syllable_texts
+from .model import Line
+
+
+def _format_time(total_cs: int) -> str:
+    total_cs = max(0, total_cs)
+    hours, rest = divmod(total_cs, 360000)
+    minutes, rest = divmod(rest, 6000)
+    return f"{hours:02d}:{minutes:02d}:{rest // 100:02d}.{rest % 100:02d}0"
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _timed_text(
+    line: Line,
+    start_cs: int,
+    end_cs: int,
+    use_romanized: bool,
+    romaji: Optional[Tuple[Optional[str], ...]],
+) -> str:
+    parts = []
+    last_cs = start_cs
+    for s, text in zip(line.syllables, syllable_texts(line, use_romanized, romaji)):
+        if last_cs < s.start_cs < end_cs:
+            parts.append(f"<{_format_time(s.start_cs)}>")
+            last_cs = s.start_cs
+        parts.append(_escape(text))
+    return "".join(parts)
+
+
+def _settings(layout: AssLayout, x: int, y: int) -> str:
+    config = layout.compiled.config
+    return f"position:{x * 100 // config.play_res_x}% line:{y * 100 // config.play_res_y}% align:center"
+
+
+def iter_vtt(layout: AssLayout) -> Iterator[str]:
+    cues: List[Tuple[int, int, int, str, str]] = []
+    for idx, (line, romaji, meta, (x, y)) in enumerate(
+        zip(layout.lead_lines, layout.lead_romaji, layout.lead_meta, layout.lead_positions)
+    ):
+        start_cs = meta.display_start_cs
+        end_cs = meta.display_end_cs
+        use_romanized = meta.use_romanized
+        text = _timed_text(line, start_cs, end_cs, use_romanized, romaji)
+        if use_romanized:
+            text += "\n" + _escape("".join(syllable_texts(line, False)))
+        cues.append((start_cs, idx, end_cs, _settings(layout, x, y), text))
+    offset = len(cues)
+    for idx, (line, start_cs, end_cs, x, y) in enumerate(layout.background):
+        text = _timed_text(line, start_cs, end_cs, False, None)
+        cues.append((start_cs, offset + idx, end_cs, _settings(layout, x, y), text))
+
+    yield "WEBVTT\n"
+    for start_cs, _, end_cs, settings, text in sorted(cues):
+        yield f"\n{_format_time(start_cs)} --> {_format_time(end_cs)} {settings}\n{text}\n"
+
+
+def write_vtt(layout: AssLayout, stream: TextIO) -> None:
+    stream.writelines(iter_vtt(layout))
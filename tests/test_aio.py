@@ -0,0 +1,46 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src import aio
+
+
+def test_cancelled_render_holds_its_slot_until_the_job_finishes(monkeypatch):
+    release = threading.Event()
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_render_file(input_path, output_path, *args):
+        with lock:
+            running.append(input_path)
+            peak.append(len(running))
+        release.wait(5)
+        with lock:
+            running.remove(input_path)
+        return True
+
+    monkeypatch.setattr(aio, "render_file", fake_render_file)
+
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            renderer = aio.AsyncRenderer(executor=executor, max_concurrency=1)
+            first = asyncio.create_task(renderer.render("a.json", "a.ass"))
+            while not running:
+                await asyncio.sleep(0.01)
+            first.cancel()
+            second = asyncio.create_task(renderer.render("b.json", "b.ass"))
+            await asyncio.sleep(0.1)
+            assert running == ["a.json"]
+            assert not first.done()
+            release.set()
+            assert await second is True
+            try:
+                await first
+            except asyncio.CancelledError:
+                pass
+            else:
+                raise AssertionError("cancelled render returned normally")
+
+    asyncio.run(scenario())
+    assert max(peak) == 1
@@ -0,0 +1,62 @@
+import tracemalloc
+from collections import Counter
+
+from benchmarks.synthetic import synthetic_lyric
+from src import model
+from src.ass_writer import generate_ass
+from src.config import default_config
+from src.parser import parse_lyrics
+from src.romanize import Romanizer, apply_overlay, romanize_overlay
+
+PEAK_SLACK_BYTES = 512
+
+
+def _overlay_peak(lyrics, romanizer):
+    romanize_overlay(lyrics, romanizer)
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        overlay = romanize_overlay(lyrics, romanizer)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return overlay, current - baseline, peak - baseline
+
+
+def test_latin_overlay_allocates_nothing_per_line():
+    romanizer = Romanizer()
+    small = parse_lyrics(synthetic_lyric(lines=100))
+    large = parse_lyrics(synthetic_lyric(lines=4000))
+
+    small_overlay, small_retained, small_peak = _overlay_peak(small, romanizer)
+    large_overlay, large_retained, large_peak = _overlay_peak(large, romanizer)
+
+    assert small_overlay is model.NO_ROMAJI
+    assert large_overlay is model.NO_ROMAJI
+    assert small_retained <= 0
+    assert large_retained <= 0
+    assert large_peak <= small_peak + PEAK_SLACK_BYTES
+
+
+def test_generate_ass_with_overlay_builds_no_model_objects(monkeypatch):
+    lyrics = parse_lyrics(synthetic_lyric(lines=200, japanese_ratio=0.7))
+    config = default_config()
+    overlay = romanize_overlay(lyrics, Romanizer())
+    assert overlay.lead
+
+    created = Counter()
+    for cls in (model.Syllable, model.Line, model.Lyrics):
+        init = cls.__init__
+
+        def counting_init(self, *args, _init=init, _name=cls.__name__, **kwargs):
+            created[_name] += 1
+            _init(self, *args, **kwargs)
+
+        monkeypatch.setattr(cls, "__init__", counting_init)
+
+    rendered = generate_ass(lyrics, config, overlay)
+    assert created == Counter()
+
+    monkeypatch.undo()
+    assert rendered == generate_ass(apply_overlay(lyrics, overlay), config)
@@ -0,0 +1,24 @@
+import json
+from pathlib import Path
+
+from src.catalog import render_records
+from src.config import default_config
+
+LYRICS = Path(__file__).resolve().parents[1] / "Lyrics"
+
+
+def _record(name: str) -> str:
+    with open(LYRICS / name / "lyric.json", encoding="utf-8") as f:
+        raw = json.load(f)
+    raw["queries"][0]["result"]["data"]["id"] = "same-id"
+    return json.dumps(raw, ensure_ascii=False)
+
+
+def test_duplicate_ids_get_distinct_outputs(tmp_path):
+    lines = [_record("Birdbrain"), _record("Machine Love"), _record("Birdbrain")]
+    results = list(render_records(lines, str(tmp_path), default_config()))
+    assert all(r.ok for r in results)
+    assert [Path(r.output_path).name for r in results] == ["same-id.ass", "same-id-2.ass", "same-id-3.ass"]
+    first = (tmp_path / "same-id.ass").read_bytes()
+    assert first == (tmp_path / "same-id-3.ass").read_bytes()
+    assert first != (tmp_path / "same-id-2.ass").read_bytes()
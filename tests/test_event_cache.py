@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+
+from src.config import default_config
+from src.event_cache import cache_path_for
+from src.generator import render_lyrics
+from src.parser import load_lyrics
+
+BIRDBRAIN = Path(__file__).resolve().parents[1] / "Lyrics" / "Birdbrain" / "lyric.json"
+
+
+def _cached_events(output_path: str) -> int:
+    with open(cache_path_for(output_path), encoding="utf-8") as f:
+        return len(json.load(f)["events"])
+
+
+def test_windowed_render_keeps_events_outside_the_window(tmp_path):
+    lyrics = load_lyrics(str(BIRDBRAIN))
+    config = default_config()
+    output_path = str(tmp_path / "bb.ass")
+
+    render_lyrics(lyrics, output_path, config, incremental=True)
+    full = _cached_events(output_path)
+    render_lyrics(lyrics, output_path, config, incremental=True, window=(1000, 2000))
+    assert _cached_events(output_path) == full
+
+    render_lyrics(lyrics, output_path, config, incremental=True)
+    assert _cached_events(output_path) == full
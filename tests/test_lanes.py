@@ -0,0 +1,89 @@
+import random
+from dataclasses import replace
+
+from benchmarks.synthetic import synthetic_lyric
+from src.ass_writer import layout_ass
+from src.config import load_config
+from src.parser import parse_lyrics
+from src.romanize import Romanizer, romanize_overlay
+
+CONFIG_PATH = "config.example.json"
+SONGS = 120
+
+
+def _two_lane_reference(layout):
+    compiled = layout.compiled
+    config = compiled.config
+    prepared = layout.prepared
+    lines = layout.lead_lines
+    show_before_cs = compiled.show_before_cs
+    use_upper = True
+    last_end_top = 0
+    last_end_bottom = 0
+    rows = []
+    for idx, line in enumerate(lines):
+        display_start = max(0, line.start_cs - show_before_cs)
+        if idx > 0:
+            gap = line.start_cs - lines[idx - 1].end_cs
+            if gap > show_before_cs:
+                use_upper = True
+            elif config.alternate_positions:
+                use_upper = not use_upper
+        style = compiled.current_upper if use_upper else compiled.current_lower
+        display_start = max(display_start, last_end_top if use_upper else last_end_bottom)
+        original = None
+        if prepared.lead_non_latin[idx] and prepared.lead_has_romanized[idx]:
+            original = compiled.original_upper if use_upper else compiled.original_lower
+        current_end = line.end_cs + style.fade_out_cs
+        original_end = line.end_cs + original.fade_out_cs if original else line.end_cs
+        if use_upper:
+            last_end_top = max(last_end_top, current_end, original_end)
+        else:
+            last_end_bottom = max(last_end_bottom, current_end, original_end)
+        rows.append((use_upper, style, display_start, original))
+
+    expected = []
+    for idx, line in enumerate(lines):
+        use_upper, style, display_start, original = rows[idx]
+        y = style.y
+        if use_upper:
+            for neighbor in (idx - 1, idx + 1):
+                if neighbor < 0 or neighbor >= len(lines) or rows[neighbor][0]:
+                    continue
+                _, n_style, n_display_start, _ = rows[neighbor]
+                if n_display_start >= line.end_cs or lines[neighbor].end_cs <= display_start:
+                    continue
+                offset = original.original_offset if original else 0
+                y = min(y, n_style.y - n_style.style.fontsize - style.padding - offset)
+                break
+        expected.append((0 if use_upper else 1, display_start, (style.x, y)))
+    return expected
+
+
+def _random_song(seed: int):
+    rnd = random.Random(seed)
+    raw = synthetic_lyric(
+        lines=rnd.randint(20, 120),
+        syllables_per_line=rnd.randint(3, 10),
+        background_density=rnd.random(),
+        japanese_ratio=rnd.choice([0.0, 0.0, 0.3, 0.7]),
+        line_gap=rnd.choice([0.05, 0.2, 0.4]),
+        seed=seed,
+        overlap=rnd.choice([0.0, 0.2, 0.5, 0.8]),
+    )
+    if seed % 4 == 0:
+        rnd.shuffle(raw["queries"][0]["result"]["data"]["Content"])
+    return parse_lyrics(raw)
+
+
+def test_two_lanes_match_the_adjacent_line_scheduler():
+    config = replace(load_config(CONFIG_PATH), lanes=2)
+    romanizer = Romanizer()
+    for seed in range(SONGS):
+        lyrics = _random_song(seed)
+        layout = layout_ass(lyrics, config, romanize_overlay(lyrics, romanizer))
+        actual = [
+            (meta.lane, meta.display_start_cs, position)
+            for meta, position in zip(layout.lead_meta, layout.lead_positions)
+        ]
+        assert actual == _two_lane_reference(layout), f"seed {seed}"
@@ -0,0 +1,50 @@
+import gc
+import time
+
+from benchmarks.synthetic import synthetic_lyric
+from src.ass_writer import layout_ass
+from src.config import default_config
+from src.parser import parse_lyrics
+from src.romanize import Romanizer, romanize_overlay
+
+LINE_COUNTS = (1000, 2000, 4000)
+MAX_GROWTH = 8.0
+
+
+def _dense_song(lines: int):
+    raw = synthetic_lyric(
+        lines=lines,
+        syllables_per_line=6,
+        background_density=1.0,
+        japanese_ratio=0.5,
+        line_gap=0.05,
+        overlap=0.3,
+    )
+    return parse_lyrics(raw)
+
+
+def _best_layout_seconds(lyrics, config, romaji, repeat: int = 5) -> float:
+    best = float("inf")
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            layout_ass(lyrics, config, romaji)
+            best = min(best, time.perf_counter() - started)
+    finally:
+        gc.enable()
+    return best
+
+
+def test_background_layout_scales_near_linearly():
+    config = default_config()
+    romanizer = Romanizer()
+    timings = []
+    for lines in LINE_COUNTS:
+        lyrics = _dense_song(lines)
+        assert len(lyrics.background_lines) == lines
+        romaji = romanize_overlay(lyrics, romanizer)
+        timings.append(_best_layout_seconds(lyrics, config, romaji))
+    growth = timings[-1] / timings[0]
+    assert growth <= MAX_GROWTH, f"layout grew {growth:.1f}x for {LINE_COUNTS[-1] // LINE_COUNTS[0]}x lines: {timings}"
@@ -0,0 +1,29 @@
+import os
+import stat
+
+from src.output import write_atomic, write_if_changed
+
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_new_file_follows_umask(tmp_path):
+    path = str(tmp_path / "song.ass")
+    mask = os.umask(0o027)
+    try:
+        write_atomic(path, b"a")
+    finally:
+        os.umask(mask)
+    assert _mode(path) == 0o640
+
+
+def test_replacing_keeps_existing_mode(tmp_path):
+    path = str(tmp_path / "song.ass")
+    write_atomic(path, b"a")
+    os.chmod(path, 0o600)
+    write_atomic(path, b"b")
+    assert _mode(path) == 0o600
+    assert write_if_changed(path, lambda stream: stream.write("c"))
+    assert _mode(path) == 0o600
+    assert os.listdir(str(tmp_path)) == ["song.ass"]
@@ -0,0 +1,45 @@
+import pytest
+
+from src.model import Line, Syllable
+from src.romanize import Romanizer, _romanize_line, _share_readings, _split_reading
+
+romanizer = Romanizer()
+pytestmark = pytest.mark.skipif(not romanizer.available, reason="pykakasi not installed")
+
+
+def _line(*texts):
+    syllables = [Syllable(text, idx * 10, idx * 10 + 10, False) for idx, text in enumerate(texts)]
+    return Line(syllables, 0, len(texts) * 10)
+
+
+@pytest.mark.parametrize(
+    "texts, expected",
+    [
+        (("夜", "空", "に"), ["yo", "zora", "ni"]),
+        (("一", "緒", "に"), ["is", "sho", "ni"]),
+        (("学", "校"), ["gak", "kou"]),
+    ],
+)
+def test_multi_syllable_segment_is_split(texts, expected):
+    assert _romanize_line(_line(*texts), romanizer) == expected
+
+
+def test_kana_only_line():
+    assert _romanize_line(_line("カ", "ラ", "オ", "ケ"), romanizer) == ["ka", "ra", "o", "ke"]
+
+
+def test_mixed_latin_and_kanji_line():
+    assert _romanize_line(_line("I ", "love ", "夜", "空"), romanizer) == [None, None, "yo", "zora"]
+    assert _romanize_line(_line("Star", "light ", "輝", "く"), romanizer) == [None, None, "kagaya", "ku"]
+
+
+def test_split_reading():
+    assert _split_reading(["夜", "空"], "よぞら", romanizer) == ["よ", "ぞら"]
+    assert _split_reading(["一", "緒"], "いっしょ", romanizer) == ["いっ", "しょ"]
+    assert _split_reading(["明", "日"], "あした", romanizer) is None
+
+
+def test_share_readings():
+    assert _share_readings(["輝", "く"], "かがやく", romanizer) == ["かがや", "く"]
+    assert _share_readings(["カ", "ラ"], "から", romanizer) == ["か", "ら"]
+    assert _share_readings(["カ", "ラ"], "かに", romanizer) is None
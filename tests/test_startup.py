@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BIRDBRAIN = ROOT / "Lyrics" / "Birdbrain" / "lyric.json"
+IMPORT_BUDGET_RATIO = float(os.environ.get("KARAOKE_IMPORT_BUDGET_RATIO", "9"))
+HEAVY_MODULES = ("pykakasi", "sqlite3", "xml.sax", "urllib.request", "http.client")
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def _import_us(module: str) -> int:
+    stderr = _python("-X", "importtime", "-c", f"import {module}").stderr
+    for line in stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} missing from -X importtime output")
+
+
+def test_cli_import_stays_within_budget():
+    cli = []
+    reference = []
+    for _ in range(5):
+        cli.append(_import_us("src.cli"))
+        reference.append(_import_us("argparse"))
+    ratio = min(cli) / min(reference)
+    assert ratio <= IMPORT_BUDGET_RATIO, (
+        f"import src.cli took {min(cli) / 1000:.1f} ms, {ratio:.1f}x import argparse"
+    )
+
+
+def test_latin_render_does_not_load_heavy_modules(tmp_path):
+    script = (
+        "import sys\n"
+        "from src.cli import main\n"
+        f"sys.argv = ['karaoke-gen', '-i', {str(BIRDBRAIN)!r}, '-o', {str(tmp_path / 'bb.ass')!r}]\n"
+        "main()\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    loaded = _python("-c", script).stdout.strip()
+    assert loaded == ""
+    assert (tmp_path / "bb.ass").stat().st_size > 0